@@ -4,7 +4,15 @@ from sqlalchemy.orm import sessionmaker
 from .config import settings
 
 # Crear el engine de la base de datos
-engine = create_engine(settings.database_url)
+# pool_pre_ping descarta conexiones cerradas por el servidor y pool_recycle las renueva
+# antes de que expiren por inactividad
+engine = create_engine(
+    settings.database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle
+)
 
 # Crear la sesión de la base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
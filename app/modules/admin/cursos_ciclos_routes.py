@@ -7,6 +7,7 @@ from datetime import datetime
 from ...database import get_db
 from ..auth.dependencies import get_admin_user
 from ...shared.models import User, RoleEnum, Carrera, Ciclo, Curso, Matricula
+from ...shared.cache import invalidar_cache_docente
 from .schemas import (
     CicloCreate, CicloUpdate, CicloResponse,
     CursoCreate, CursoUpdate, CursoResponse, CursoListResponse
@@ -230,7 +231,7 @@ def get_cursos(
         
         # Agregar nombre del docente si está asignado
         if curso.docente:
-            curso.docente_nombre = f"{curso.docente.first_name} {curso.docente.last_name}"
+            curso.docente_nombre = curso.docente.full_name
         
         # Contar matriculados por ciclo (ya que las matrículas están relacionadas con ciclos, no cursos)
         curso.total_matriculados = db.query(Matricula).filter(
@@ -272,6 +273,7 @@ def create_curso(
     db.add(new_curso)
     db.commit()
     db.refresh(new_curso)
+    invalidar_cache_docente(new_curso.docente_id)
     
     return new_curso
 
@@ -306,12 +308,14 @@ def update_curso(
                 detail="Ciclo no encontrado o inactivo"
             )
     
-    # Actualizar campos
+    # Actualizar campos (el docente anterior también pierde o cambia el curso)
+    docente_anterior_id = curso.docente_id
     for field, value in curso_data.dict(exclude_unset=True).items():
         setattr(curso, field, value)
     
     db.commit()
     db.refresh(curso)
+    invalidar_cache_docente(docente_anterior_id, curso.docente_id)
     
     return curso
 
@@ -336,7 +340,9 @@ def delete_curso(
     # No need to check for associated matriculas
     
     # Eliminar definitivamente el curso
+    docente_id = curso.docente_id
     db.delete(curso)
     db.commit()
+    invalidar_cache_docente(docente_id)
     
     return {"message": "Curso eliminado definitivamente"}
\ No newline at end of file
@@ -8,7 +8,10 @@ from ...database import get_db
 from ..auth.dependencies import get_admin_user
 from ..auth.security import get_password_hash
 from ...shared.models import User, RoleEnum, Matricula, Nota, Ciclo, Curso, Carrera, DescripcionEvaluacion
-from ...shared.grade_calculator import GradeCalculator
+from ...shared.grade_calculator import (
+    GradeCalculator, valores_nota,
+    CAMPOS_EVALUACIONES, CAMPOS_PRACTICAS, CAMPOS_PARCIALES
+)
 from .schemas import UserCreate, UserUpdate, UserResponse, UserListResponse, DescripcionEvaluacionResponse
 
 router = APIRouter(prefix="/estudiantes", tags=["Admin - Estudiantes"])
@@ -400,23 +403,10 @@ def get_academic_performance_by_dni(
                 except Exception as e:
                     promedio_final = None
                 
-                # Preparar evaluaciones
-                evaluaciones = {}
-                for i in range(1, 9):
-                    eval_val = getattr(nota, f'evaluacion{i}')
-                    evaluaciones[f'evaluacion{i}'] = float(eval_val) if eval_val is not None else None
-                
-                # Preparar prácticas
-                practicas = {}
-                for i in range(1, 5):
-                    prac_val = getattr(nota, f'practica{i}')
-                    practicas[f'practica{i}'] = float(prac_val) if prac_val is not None else None
-                
-                # Preparar parciales
-                parciales = {}
-                for i in range(1, 3):
-                    parc_val = getattr(nota, f'parcial{i}')
-                    parciales[f'parcial{i}'] = float(parc_val) if parc_val is not None else None
+                # Preparar evaluaciones, prácticas y parciales
+                evaluaciones = valores_nota(nota, CAMPOS_EVALUACIONES)
+                practicas = valores_nota(nota, CAMPOS_PRACTICAS)
+                parciales = valores_nota(nota, CAMPOS_PARCIALES)
                 
                 # Determinar estado basado en las notas completadas
                 if promedio_final and float(promedio_final) >= 13.0:
@@ -435,9 +425,9 @@ def get_academic_performance_by_dni(
             else:
                 # Curso sin notas
                 promedio_final = None
-                evaluaciones = {f'evaluacion{i}': None for i in range(1, 9)}
-                practicas = {f'practica{i}': None for i in range(1, 5)}
-                parciales = {f'parcial{i}': None for i in range(1, 3)}
+                evaluaciones = dict.fromkeys(CAMPOS_EVALUACIONES)
+                practicas = dict.fromkeys(CAMPOS_PRACTICAS)
+                parciales = dict.fromkeys(CAMPOS_PARCIALES)
                 estado = "Pendiente"
             
             curso_rendimiento = {
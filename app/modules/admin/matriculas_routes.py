@@ -9,6 +9,7 @@ import re
 from ...database import get_db
 from ..auth.dependencies import get_admin_user
 from ...shared.models import User, RoleEnum, Carrera, Ciclo, Curso, Matricula
+from ...shared.cache import invalidar_cache_estudiante, invalidar_cache_docentes
 from .schemas import MatriculaCreate, MatriculaUpdate, UserResponse
 
 router = APIRouter(prefix="/matriculas", tags=["Admin - Matrículas"])
@@ -224,9 +225,14 @@ def delete_matricula(
         )
     
     # Eliminar completamente la matrícula
+    estudiante_id = matricula.estudiante_id
     db.delete(matricula)
     db.commit()
     
+    # Dashboards cacheados del estudiante y de los docentes del ciclo
+    invalidar_cache_estudiante(estudiante_id)
+    invalidar_cache_docentes()
+    
     return {"message": "Matrícula eliminada exitosamente"}
 
 # ==================== ENDPOINTS ESPECÍFICOS ====================
@@ -351,7 +357,7 @@ def get_ciclos_disponibles_para_estudiante(
     return {
         "estudiante": {
             "id": estudiante.id,
-            "nombres": f"{estudiante.first_name} {estudiante.last_name}",
+            "nombres": estudiante.full_name,
             "dni": estudiante.dni,
             "carrera": estudiante.carrera.nombre if estudiante.carrera else None
         },
@@ -375,7 +381,6 @@ def matricular_estudiante_ciclo(
     
     # Si no se proporciona código, generar uno automáticamente
     if not codigo_matricula:
-        import uuid
         codigo_matricula = f"MAT-{uuid.uuid4().hex[:8].upper()}"
     
     # Verificar que el estudiante existe y está activo
@@ -431,6 +436,10 @@ def matricular_estudiante_ciclo(
     db.commit()
     db.refresh(nueva_matricula)
     
+    # Dashboards cacheados del estudiante y de los docentes del ciclo
+    invalidar_cache_estudiante(estudiante_id)
+    invalidar_cache_docentes()
+    
     # Cargar relaciones para la respuesta
     matricula_completa = db.query(Matricula).options(
         joinedload(Matricula.estudiante),
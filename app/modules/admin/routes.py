@@ -112,7 +112,7 @@ def get_admin_dashboard(
     actividad_reciente = [
         {
             "tipo": "nuevo_usuario",
-            "descripcion": f"Nuevo {usuario.role.value}: {usuario.first_name} {usuario.last_name}",
+            "descripcion": f"Nuevo {usuario.role.value}: {usuario.full_name}",
             "fecha": usuario.created_at,
             "usuario_id": usuario.id
         }
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+import secrets
 from ...database import get_db
 from .models import User, PasswordResetToken
 from .schemas import UserLogin, Token, UserResponse, PasswordReset, PasswordResetConfirm, ChangePassword, UserUpdate, TokenVerificationResponse, TokenVerificationRequest
@@ -61,8 +62,6 @@ def request_password_reset(password_reset: PasswordReset, db: Session = Depends(
     user = db.query(User).filter(User.email == password_reset.email).first()
     
     if user:
-        import secrets
-        
         # ✅ GENERAR DOS TOKENS
         identificator_token = secrets.token_urlsafe(16)  # Corto para URL
         verification_token = secrets.token_urlsafe(32)   # Largo para verificación
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload, raiseload
 from typing import List, Optional
+import logging
 
 from ...database import get_db
 from ..auth.dependencies import get_estudiante_user
 from ..auth.models import User
-from .models import Carrera, Ciclo, Curso, Matricula, Nota
+from .models import Carrera, Ciclo, Curso, Matricula, Nota, DOCENTE_NOMBRE
 from .schemas import (
     CursoEstudianteResponse, 
     MatriculaResponse
 )
 
 router = APIRouter(tags=["Estudiante - Cursos"])
+logger = logging.getLogger(__name__)
 
 @router.get("/courses/filters")
 def get_student_courses_filters(
@@ -36,13 +38,13 @@ def get_student_courses_filters(
         }
         
     except Exception as e:
-        print(f"Error in get_student_courses_filters: {e}")
+        logger.exception("Error in get_student_courses_filters")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener los filtros de cursos"
         )
 
-@router.get("/courses", response_model=List[CursoEstudianteResponse])
+@router.get("/courses", response_model=None, responses={200: {"model": List[CursoEstudianteResponse]}})
 def get_student_courses(
     current_user: User = Depends(get_estudiante_user),
     db: Session = Depends(get_db),
@@ -65,94 +67,90 @@ def get_student_courses(
         if numero_ciclo:
             matriculas_query = matriculas_query.filter(Ciclo.numero == numero_ciclo)
         
-        matriculas_activas = matriculas_query.all()
-        
-        # Obtener cursos de los ciclos en los que está matriculado
-        ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
-        
-        if not ciclo_ids:
-            return []
-        
-        cursos = db.query(Curso).filter(
-            Curso.ciclo_id.in_(ciclo_ids),
+        # Ciclos matriculados como subconsulta: una sola consulta para los cursos
+        ciclos_matriculados = matriculas_query.with_entities(Matricula.ciclo_id).scalar_subquery()
+        
+        # Obtener cursos de los ciclos en los que está matriculado: solo las columnas
+        # de la respuesta, con las etiquetas de CursoEstudianteResponse
+        cursos = db.query(
+            Curso.id,
+            Curso.nombre,
+            DOCENTE_NOMBRE,
+            Ciclo.nombre.label("ciclo_nombre"),
+            Ciclo.año.label("ciclo_año"),
+            Ciclo.numero.label("ciclo_numero"),
+            Ciclo.fecha_inicio,
+            Ciclo.fecha_fin,
+            Carrera.nombre.label("carrera_nombre")
+        ).join(
+            Ciclo, Curso.ciclo_id == Ciclo.id
+        ).join(
+            Carrera, Ciclo.carrera_id == Carrera.id
+        ).outerjoin(
+            User, Curso.docente_id == User.id
+        ).filter(
+            Curso.ciclo_id.in_(ciclos_matriculados),
             Curso.is_active == True
-        ).options(
-            joinedload(Curso.ciclo).joinedload(Ciclo.carrera),
-            joinedload(Curso.docente)
         ).all()
         
-        # Convertir a formato de respuesta
-        cursos_response = []
-        for curso in cursos:
-            curso_data = {
-                "id": curso.id,
-                "nombre": curso.nombre,
-                "docente_nombre": f"{curso.docente.first_name} {curso.docente.last_name}",
-                "ciclo_nombre": curso.ciclo.nombre,
-                "ciclo_año": curso.ciclo.año,
-                "ciclo_numero": curso.ciclo.numero,
-                "fecha_inicio": curso.ciclo.fecha_inicio.strftime("%Y-%m-%d") if curso.ciclo.fecha_inicio else None,
-                "fecha_fin": curso.ciclo.fecha_fin.strftime("%Y-%m-%d") if curso.ciclo.fecha_fin else None,
-                "horario": None,  # Campo no implementado aún
-                "aula": None,     # Campo no implementado aún
-                "carrera_nombre": curso.ciclo.carrera.nombre if curso.ciclo.carrera else None
-            }
-            
-            cursos_response.append(curso_data)
-        
-        return cursos_response
+        # horario y aula: campos no implementados aún
+        return [{**curso._asdict(), "horario": None, "aula": None} for curso in cursos]
         
     except Exception as e:
-        print(f"Error in get_student_courses: {e}")
+        logger.exception("Error in get_student_courses")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener los cursos del estudiante"
         )
 
+def _matriculas_estudiante(current_user: User, db: Session, ciclo_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None):
+    """Matrículas del estudiante, las más recientes primero"""
+    # Query base para matrículas del estudiante
+    matriculas_query = db.query(Matricula).filter(
+        Matricula.estudiante_id == current_user.id
+    ).options(
+        selectinload(Matricula.ciclo).selectinload(Ciclo.carrera),
+        selectinload(Matricula.estudiante),
+        raiseload('*')
+    )
+    
+    # Aplicar filtros
+    if ciclo_id:
+        matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
+    
+    matriculas = matriculas_query.order_by(Matricula.created_at.desc()).offset(skip).limit(limit).all()
+    
+    # Convertir a formato de respuesta
+    return [
+        {
+            "id": matricula.id,
+            "estudiante_id": matricula.estudiante_id,
+            "estudiante_nombre": matricula.estudiante.full_name,
+            "ciclo_id": matricula.ciclo_id,
+            "ciclo_nombre": matricula.ciclo.nombre,
+            "ciclo_año": matricula.ciclo.año,
+            "carrera_nombre": matricula.ciclo.carrera.nombre if matricula.ciclo.carrera else None,
+            "fecha_matricula": matricula.created_at,
+            "is_active": matricula.is_active
+        }
+        for matricula in matriculas
+    ]
+
 @router.get("/enrollments", response_model=List[MatriculaResponse])
 def get_student_enrollments(
     current_user: User = Depends(get_estudiante_user),
     db: Session = Depends(get_db),
-    ciclo_id: Optional[int] = Query(None, description="Filtrar por ciclo específico")
+    ciclo_id: Optional[int] = Query(None, description="Filtrar por ciclo específico"),
+    skip: int = Query(0, ge=0, description="Número de registros a omitir"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número de registros a obtener (sin límite si se omite)")
 ):
-    """Obtener matrículas del estudiante"""
+    """Obtener matrículas del estudiante, las más recientes primero (paginables con skip/limit)"""
     
     try:
-        # Query base para matrículas del estudiante
-        matriculas_query = db.query(Matricula).filter(
-            Matricula.estudiante_id == current_user.id
-        ).options(
-            joinedload(Matricula.ciclo).joinedload(Ciclo.carrera),
-            joinedload(Matricula.estudiante)
-        )
-        
-        # Aplicar filtros
-        if ciclo_id:
-            matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
-        
-        matriculas = matriculas_query.order_by(Matricula.created_at.desc()).all()
-        
-        # Convertir a formato de respuesta
-        matriculas_response = []
-        for matricula in matriculas:
-            matricula_data = {
-                "id": matricula.id,
-                "estudiante_id": matricula.estudiante_id,
-                "estudiante_nombre": f"{matricula.estudiante.first_name} {matricula.estudiante.last_name}",
-                "ciclo_id": matricula.ciclo_id,
-                "ciclo_nombre": matricula.ciclo.nombre,
-                "ciclo_año": matricula.ciclo.año,
-                "carrera_nombre": matricula.ciclo.carrera.nombre if matricula.ciclo.carrera else None,
-                "fecha_matricula": matricula.created_at,
-                "is_active": matricula.is_active
-            }
-            
-            matriculas_response.append(matricula_data)
-        
-        return matriculas_response
+        return _matriculas_estudiante(current_user, db, ciclo_id, skip, limit)
         
     except Exception as e:
-        print(f"Error in get_student_enrollments: {e}")
+        logger.exception("Error in get_student_enrollments")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener las matrículas del estudiante"
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, lambda_stmt, func, and_
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload, contains_eager, load_only
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
+import logging
 
 from ...database import get_db
 from ..auth.dependencies import get_estudiante_user
 from ..auth.models import User
 from ...shared.models import Carrera, Ciclo, Curso, Matricula, Nota, DescripcionEvaluacion
-from ...shared.grade_calculator import GradeCalculator
+from .models import DOCENTE_NOMBRE
+from ...shared.grade_calculator import GradeCalculator, CAMPOS_NOTA, valores_nota
+from ...shared.cache import ESTADISTICAS_ESTUDIANTE, cache_por_usuario
+from ...config import settings
 from .schemas import (
     EstadisticasEstudiante,
     PromedioFinalEstudianteResponse, 
@@ -21,105 +27,111 @@ from .schemas import (
 )
 
 router = APIRouter(tags=["Estudiante - Calificaciones"])
+logger = logging.getLogger(__name__)
 
-@router.get("/grades", response_model=List[NotaEstudianteResponse])
+# (columna, grupo, número, etiqueta) de cada nota, para agrupar por tipo en una sola pasada
+_CAMPOS_POR_TIPO = (
+    [(f'evaluacion{i}', "evaluaciones_semanales", i, f"Evaluación {i}") for i in range(1, 9)] +
+    [(f'practica{i}', "evaluaciones_practicas", i, f"Práctica {i}") for i in range(1, 5)] +
+    [(f'parcial{i}', "evaluaciones_parciales", i, f"Parcial {i}") for i in range(1, 3)]
+)
+
+def _a_float(valor):
+    """Promedio (Decimal o None) como float para la respuesta"""
+    return float(valor) if valor is not None else None
+
+def _detalle_float(detalle):
+    """Promedios por categoría del detalle como float, igual que el resto de promedios"""
+    return {campo: _a_float(valor) for campo, valor in detalle.items()}
+
+def _condiciones_notas(db: Session, estudiante_id: int, ciclo_id: Optional[int] = None,
+                       docente_id: Optional[int] = None, curso_id: Optional[int] = None):
+    """Condiciones WHERE de las notas del estudiante en sus ciclos con matrícula activa
+    (la consulta debe hacer JOIN con Curso)"""
+    ciclos_matriculados = db.query(Matricula.ciclo_id).filter(
+        Matricula.estudiante_id == estudiante_id,
+        Matricula.is_active == True
+    )
+    if ciclo_id:
+        ciclos_matriculados = ciclos_matriculados.filter(Matricula.ciclo_id == ciclo_id)
+    
+    condiciones = [
+        Nota.estudiante_id == estudiante_id,
+        Curso.ciclo_id.in_(ciclos_matriculados.scalar_subquery())
+    ]
+    if docente_id:
+        condiciones.append(Curso.docente_id == docente_id)
+    if curso_id:
+        condiciones.append(Nota.curso_id == curso_id)
+    return condiciones
+
+def _notas_estudiante(current_user: User, db: Session, ciclo_id: Optional[int] = None, docente_id: Optional[int] = None,
+                      curso_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None):
+    """Calificaciones del estudiante como dicts con las claves de NotaEstudianteResponse"""
+    # Query para obtener notas: solo las columnas de la respuesta (filas ligeras, sin
+    # objetos ORM). GradeCalculator lee las calificaciones por nombre desde la fila.
+    notas_query = db.query(
+        Nota.id,
+        Nota.curso_id,
+        *(getattr(Nota, campo) for campo in CAMPOS_NOTA),
+        Curso.nombre.label("curso_nombre"),
+        DOCENTE_NOMBRE,
+        Ciclo.nombre.label("ciclo_nombre"),
+        Ciclo.año.label("ciclo_año")
+    ).join(
+        Curso, Nota.curso_id == Curso.id
+    ).join(
+        Ciclo, Curso.ciclo_id == Ciclo.id
+    ).outerjoin(
+        User, Curso.docente_id == User.id
+    ).filter(
+        *_condiciones_notas(db, current_user.id, ciclo_id, docente_id, curso_id)
+    )
+    
+    notas = notas_query.order_by(Nota.id).offset(skip).limit(limit).all()
+    
+    # Las claves son exactamente las de NotaEstudianteResponse
+    return [
+        {
+            "id": nota.id,
+            "curso_id": nota.curso_id,
+            "curso_nombre": nota.curso_nombre,
+            "docente_nombre": nota.docente_nombre,
+            "ciclo_nombre": nota.ciclo_nombre,
+            "ciclo_año": nota.ciclo_año,
+            "promedio_evaluaciones": None,
+            "promedio_practicas": None,
+            "promedio_parciales": None,
+            "promedio_final": _a_float(GradeCalculator.calcular_promedio_nota(nota)),
+            "estado": None,
+            # Notas individuales (evaluacion1-8, practica1-4, parcial1-2)
+            **valores_nota(nota),
+            "fecha_registro": None,
+            "observaciones": None
+        }
+        for nota in notas
+    ]
+
+@router.get("/grades", response_model=None, responses={200: {"model": List[NotaEstudianteResponse]}})
 def get_student_grades(
     current_user: User = Depends(get_estudiante_user),
     db: Session = Depends(get_db),
     ciclo_id: Optional[int] = Query(None, description="Filtrar por ciclo específico"),
     docente_id: Optional[int] = Query(None, description="Filtrar por docente específico"),
-    curso_id: Optional[int] = Query(None, description="Filtrar por curso específico")
+    curso_id: Optional[int] = Query(None, description="Filtrar por curso específico"),
+    skip: int = Query(0, ge=0, description="Número de registros a omitir"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número de registros a obtener (sin límite si se omite)")
 ):
-    """Obtener todas las calificaciones del estudiante con filtros opcionales"""
+    """Obtener las calificaciones del estudiante con filtros opcionales (paginables con skip/limit, total en /grades/count)"""
     
     try:
-        # Obtener matrículas activas del estudiante
-        matriculas_query = db.query(Matricula).filter(
-            Matricula.estudiante_id == current_user.id,
-            Matricula.is_active == True
-        )
-        
-        # Aplicar filtros
-        if ciclo_id:
-            matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
-        
-        matriculas_activas = matriculas_query.all()
-        
-        # Obtener cursos de los ciclos en los que está matriculado
-        ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
-        
-        if not ciclo_ids:
-            return []
-        
-        # Query para obtener notas
-        notas_query = db.query(Nota).join(Curso).join(Ciclo).filter(
-            Nota.estudiante_id == current_user.id,
-            Curso.ciclo_id.in_(ciclo_ids)
-        ).options(
-            joinedload(Nota.curso).joinedload(Curso.docente),
-            joinedload(Nota.curso).joinedload(Curso.ciclo).joinedload(Ciclo.carrera)
-        )
-        
-        # Aplicar filtros adicionales
-        if docente_id:
-            notas_query = notas_query.filter(Curso.docente_id == docente_id)
-        
-        if curso_id:
-            notas_query = notas_query.filter(Nota.curso_id == curso_id)
-        
-        notas = notas_query.all()
-        
-        # Convertir a formato de respuesta
-        notas_response = []
-        for nota in notas:
-            # Calcular promedio usando GradeCalculator
-            promedio = GradeCalculator.calcular_promedio_nota(nota)
-            
-            nota_data = {
-                "id": nota.id,
-                "curso_id": nota.curso_id,
-                "curso_nombre": nota.curso.nombre,
-                "docente_id": nota.curso.docente_id,
-                "docente_nombre": f"{nota.curso.docente.first_name} {nota.curso.docente.last_name}",
-                "ciclo_id": nota.curso.ciclo_id,
-                "ciclo_nombre": nota.curso.ciclo.nombre,
-                "ciclo_año": nota.curso.ciclo.año,
-                "carrera_nombre": nota.curso.ciclo.carrera.nombre if nota.curso.ciclo.carrera else None,
-                
-                # Evaluaciones semanales
-                "evaluacion1": float(nota.evaluacion1) if nota.evaluacion1 is not None else None,
-                "evaluacion2": float(nota.evaluacion2) if nota.evaluacion2 is not None else None,
-                "evaluacion3": float(nota.evaluacion3) if nota.evaluacion3 is not None else None,
-                "evaluacion4": float(nota.evaluacion4) if nota.evaluacion4 is not None else None,
-                "evaluacion5": float(nota.evaluacion5) if nota.evaluacion5 is not None else None,
-                "evaluacion6": float(nota.evaluacion6) if nota.evaluacion6 is not None else None,
-                "evaluacion7": float(nota.evaluacion7) if nota.evaluacion7 is not None else None,
-                "evaluacion8": float(nota.evaluacion8) if nota.evaluacion8 is not None else None,
-                
-                # Prácticas
-                "practica1": float(nota.practica1) if nota.practica1 is not None else None,
-                "practica2": float(nota.practica2) if nota.practica2 is not None else None,
-                "practica3": float(nota.practica3) if nota.practica3 is not None else None,
-                "practica4": float(nota.practica4) if nota.practica4 is not None else None,
-                
-                # Parciales
-                "parcial1": float(nota.parcial1) if nota.parcial1 is not None else None,
-                "parcial2": float(nota.parcial2) if nota.parcial2 is not None else None,
-                
-                # Promedio calculado
-                "promedio_final": float(promedio) if promedio is not None else None,
-                
-                # Fechas
-                "created_at": nota.created_at,
-                "updated_at": nota.updated_at
-            }
-            
-            notas_response.append(nota_data)
-        
-        return notas_response
+        # Los datos vienen de la BD: se serializan directamente con orjson sin volver a
+        # validarlos fila por fila contra NotaEstudianteResponse (response_model queda
+        # para la documentación)
+        return ORJSONResponse(_notas_estudiante(current_user, db, ciclo_id, docente_id, curso_id, skip, limit))
         
     except Exception as e:
-        print(f"Error in get_student_grades: {e}")
+        logger.exception("Error in get_student_grades")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener las calificaciones del estudiante"
@@ -137,7 +149,7 @@ def get_student_grades_filters(
         matriculas_activas = db.query(Matricula).filter(
             Matricula.estudiante_id == current_user.id,
             Matricula.is_active == True
-        ).all()
+        ).options(load_only(Matricula.ciclo_id)).all()
         
         # Obtener cursos de los ciclos en los que está matriculado
         ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
@@ -174,20 +186,104 @@ def get_student_grades_filters(
             "docentes": [
                 {
                     "id": docente.id,
-                    "nombre": f"{docente.first_name} {docente.last_name}"
+                    "nombre": docente.full_name
                 }
                 for docente in docentes
             ]
         }
         
     except Exception as e:
-        print(f"Error in get_student_grades_filters: {e}")
+        logger.exception("Error in get_student_grades_filters")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener los filtros de calificaciones"
         )
 
+@router.get("/grades/count")
+def get_student_grades_count(
+    current_user: User = Depends(get_estudiante_user),
+    db: Session = Depends(get_db),
+    ciclo_id: Optional[int] = Query(None, description="Filtrar por ciclo específico"),
+    docente_id: Optional[int] = Query(None, description="Filtrar por docente específico"),
+    curso_id: Optional[int] = Query(None, description="Filtrar por curso específico")
+):
+    """Total de calificaciones del estudiante con los mismos filtros que /grades (para paginar)"""
+    
+    total = db.query(func.count(Nota.id)).join(
+        Curso, Nota.curso_id == Curso.id
+    ).filter(
+        *_condiciones_notas(db, current_user.id, ciclo_id, docente_id, curso_id)
+    ).scalar()
+    
+    return {"total": total}
+
+def _estadisticas_calificaciones(current_user: User, db: Session, ciclo_id: Optional[int] = None, docente_id: Optional[int] = None):
+    """Estadísticas de calificaciones del estudiante (EstadisticasEstudiante)"""
+    # Obtener matrículas activas del estudiante
+    matriculas_query = db.query(Matricula).filter(
+        Matricula.estudiante_id == current_user.id,
+        Matricula.is_active == True
+    )
+    
+    # Aplicar filtros
+    if ciclo_id:
+        matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
+    
+    # Ciclos matriculados como subconsulta (sin cargar las matrículas)
+    ciclos_matriculados = matriculas_query.with_entities(Matricula.ciclo_id).scalar_subquery()
+    
+    # Query para obtener notas - solo las columnas de calificación que usa GradeCalculator
+    notas_stmt = select(Nota).join(Curso).where(
+        Nota.estudiante_id == current_user.id,
+        Curso.ciclo_id.in_(ciclos_matriculados)
+    ).options(
+        load_only(*(getattr(Nota, campo) for campo in CAMPOS_NOTA))
+    )
+    
+    # Aplicar filtros adicionales
+    if docente_id:
+        notas_stmt = notas_stmt.where(Curso.docente_id == docente_id)
+    
+    # Calcular estadísticas en una sola pasada, leyendo las notas por lotes
+    total_cursos = 0
+    cursos_aprobados = 0
+    cursos_desaprobados = 0
+    cursos_pendientes = 0
+    promedios_validos = []
+    
+    for nota in db.execute(notas_stmt.execution_options(yield_per=500)).scalars():
+        total_cursos += 1
+        promedio = GradeCalculator.calcular_promedio_nota(nota)
+        
+        if promedio is not None:
+            # Una sola conversión Decimal -> float por nota para todas las reducciones
+            promedio = float(promedio)
+            promedios_validos.append(promedio)
+            if promedio >= 13:
+                cursos_aprobados += 1
+            else:
+                cursos_desaprobados += 1
+        else:
+            cursos_pendientes += 1
+    
+    # Calcular promedio general
+    promedio_general = 0
+    if promedios_validos:
+        promedio_general = sum(promedios_validos) / len(promedios_validos)
+    
+    # Calcular créditos completados (créditos fijos por curso aprobado)
+    creditos_completados = cursos_aprobados * GradeCalculator.CREDITOS_POR_CURSO
+    
+    return {
+        "total_cursos": total_cursos,
+        "promedio_general": round(promedio_general, 2),
+        "cursos_aprobados": cursos_aprobados,
+        "cursos_desaprobados": cursos_desaprobados,
+        "creditos_completados": creditos_completados
+    }
+
 @router.get("/grades/statistics", response_model=EstadisticasEstudiante)
+@cache_por_usuario(expire=settings.estadisticas_cache_ttl, namespace=ESTADISTICAS_ESTUDIANTE)
 def get_student_grades_statistics(
     current_user: User = Depends(get_estudiante_user),
     db: Session = Depends(get_db),
@@ -197,79 +293,10 @@ def get_student_grades_statistics(
     """Obtener estadísticas de calificaciones del estudiante"""
     
     try:
-        # Obtener matrículas activas del estudiante
-        matriculas_query = db.query(Matricula).filter(
-            Matricula.estudiante_id == current_user.id,
-            Matricula.is_active == True
-        )
-        
-        # Aplicar filtros
-        if ciclo_id:
-            matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
-        
-        matriculas_activas = matriculas_query.all()
-        
-        # Obtener cursos de los ciclos en los que está matriculado
-        ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
-        
-        if not ciclo_ids:
-            return {
-                "total_cursos": 0,
-                "promedio_general": 0,
-                "cursos_aprobados": 0,
-                "cursos_desaprobados": 0,
-                "cursos_pendientes": 0
-            }
-        
-        # Query para obtener notas
-        notas_query = db.query(Nota).join(Curso).filter(
-            Nota.estudiante_id == current_user.id,
-            Curso.ciclo_id.in_(ciclo_ids)
-        )
-        
-        # Aplicar filtros adicionales
-        if docente_id:
-            notas_query = notas_query.filter(Curso.docente_id == docente_id)
-        
-        notas = notas_query.all()
-        
-        # Calcular estadísticas
-        total_cursos = len(notas)
-        cursos_aprobados = 0
-        cursos_desaprobados = 0
-        cursos_pendientes = 0
-        promedios_validos = []
-        
-        for nota in notas:
-            promedio = GradeCalculator.calcular_promedio_nota(nota)
-            
-            if promedio is not None:
-                promedios_validos.append(float(promedio))
-                if float(promedio) >= 13:
-                    cursos_aprobados += 1
-                else:
-                    cursos_desaprobados += 1
-            else:
-                cursos_pendientes += 1
-        
-        # Calcular promedio general
-        promedio_general = 0
-        if promedios_validos:
-            promedio_general = sum(promedios_validos) / len(promedios_validos)
-        
-        # Calcular créditos completados (asumiendo 3 créditos por curso aprobado)
-        creditos_completados = cursos_aprobados * 3
-        
-        return {
-            "total_cursos": total_cursos,
-            "promedio_general": round(promedio_general, 2),
-            "cursos_aprobados": cursos_aprobados,
-            "cursos_desaprobados": cursos_desaprobados,
-            "creditos_completados": creditos_completados
-        }
+        return _estadisticas_calificaciones(current_user, db, ciclo_id, docente_id)
         
     except Exception as e:
-        print(f"Error in get_student_grades_statistics: {e}")
+        logger.exception("Error in get_student_grades_statistics")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener las estadísticas de calificaciones"
@@ -363,7 +390,7 @@ def get_academic_performance(
                         total_promedio += float(promedio_curso)
                         cursos_con_notas += 1
                 except Exception as e:
-                    print(f"Error calculando promedio para curso {nota.curso.nombre}: {e}")
+                    logger.exception("Error calculando promedio para curso %s", nota.curso.nombre)
                     continue
             
             # Calcular promedio del ciclo
@@ -393,15 +420,51 @@ def get_academic_performance(
         return performance_data
         
     except Exception as e:
-        print(f"ERROR CRÍTICO en get_academic_performance: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error crítico en get_academic_performance")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener el rendimiento académico: {str(e)}"
         )
 
-@router.get("/grades/{curso_id}", response_model=List[NotaEstudianteResponse])
+def _nota_curso_stmt(estudiante_id: int, curso_id: int):
+    """(matrícula activa, nota) del estudiante en un curso, con curso, docente y ciclo.
+    lambda_stmt guarda el statement ya construido y solo cambia los parámetros entre peticiones"""
+    return lambda_stmt(lambda: select(Matricula.id, Nota).select_from(Curso).join(
+        Matricula, and_(
+            Matricula.ciclo_id == Curso.ciclo_id,
+            Matricula.estudiante_id == estudiante_id,
+            Matricula.is_active == True
+        )
+    ).outerjoin(
+        Nota, and_(Nota.curso_id == Curso.id, Nota.estudiante_id == estudiante_id)
+    ).where(
+        Curso.id == curso_id
+    ).options(
+        joinedload(Nota.curso).joinedload(Curso.docente),
+        joinedload(Nota.curso).joinedload(Curso.ciclo),
+        raiseload('*')
+    ))
+
+def _nota_curso_matriculado(db: Session, estudiante_id: int, curso_id: int) -> Nota:
+    """Nota del estudiante en un curso de un ciclo en el que está matriculado.
+    La matrícula y la nota se verifican en una sola consulta; 404 si falta alguna"""
+    fila = db.execute(_nota_curso_stmt(estudiante_id, curso_id)).first()
+    
+    if not fila:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No estás matriculado en este curso"
+        )
+    
+    if fila.Nota is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No se encontraron calificaciones para este curso"
+        )
+    
+    return fila.Nota
+
+@router.get("/grades/{curso_id}", response_model=None, responses={200: {"model": List[NotaEstudianteResponse]}})
 def get_student_grades_by_course(
     curso_id: int,
     current_user: User = Depends(get_estudiante_user),
@@ -410,74 +473,32 @@ def get_student_grades_by_course(
     """Obtener calificaciones del estudiante para un curso específico"""
     
     try:
-        # Verificar que el estudiante esté matriculado en el curso
-        matricula = db.query(Matricula).join(Curso).filter(
-            Matricula.estudiante_id == current_user.id,
-            Curso.id == curso_id,
-            Matricula.is_active == True
-        ).first()
-        
-        if not matricula:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No estás matriculado en este curso"
-            )
-        
-        # Obtener notas del curso
-        nota = db.query(Nota).filter(
-            Nota.estudiante_id == current_user.id,
-            Nota.curso_id == curso_id
-        ).options(
-            joinedload(Nota.curso).joinedload(Curso.docente),
-            joinedload(Nota.curso).joinedload(Curso.ciclo).joinedload(Ciclo.carrera)
-        ).first()
-        
-        if not nota:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No se encontraron calificaciones para este curso"
-            )
+        # Matrícula en el ciclo del curso y nota del curso (una sola consulta)
+        nota = _nota_curso_matriculado(db, current_user.id, curso_id)
         
         # Calcular promedio usando GradeCalculator
         promedio = GradeCalculator.calcular_promedio_nota(nota)
         
+        # Exactamente los campos de NotaEstudianteResponse (la respuesta no pasa por response_model)
         nota_data = {
             "id": nota.id,
             "curso_id": nota.curso_id,
             "curso_nombre": nota.curso.nombre,
-            "docente_id": nota.curso.docente_id,
-            "docente_nombre": f"{nota.curso.docente.first_name} {nota.curso.docente.last_name}",
-            "ciclo_id": nota.curso.ciclo_id,
+            "docente_nombre": nota.curso.docente.full_name if nota.curso.docente else "Sin asignar",
             "ciclo_nombre": nota.curso.ciclo.nombre,
             "ciclo_año": nota.curso.ciclo.año,
-            "carrera_nombre": nota.curso.ciclo.carrera.nombre if nota.curso.ciclo.carrera else None,
-            
-            # Evaluaciones semanales
-            "evaluacion1": float(nota.evaluacion1) if nota.evaluacion1 is not None else None,
-            "evaluacion2": float(nota.evaluacion2) if nota.evaluacion2 is not None else None,
-            "evaluacion3": float(nota.evaluacion3) if nota.evaluacion3 is not None else None,
-            "evaluacion4": float(nota.evaluacion4) if nota.evaluacion4 is not None else None,
-            "evaluacion5": float(nota.evaluacion5) if nota.evaluacion5 is not None else None,
-            "evaluacion6": float(nota.evaluacion6) if nota.evaluacion6 is not None else None,
-            "evaluacion7": float(nota.evaluacion7) if nota.evaluacion7 is not None else None,
-            "evaluacion8": float(nota.evaluacion8) if nota.evaluacion8 is not None else None,
-            
-            # Prácticas
-            "practica1": float(nota.practica1) if nota.practica1 is not None else None,
-            "practica2": float(nota.practica2) if nota.practica2 is not None else None,
-            "practica3": float(nota.practica3) if nota.practica3 is not None else None,
-            "practica4": float(nota.practica4) if nota.practica4 is not None else None,
             
-            # Parciales
-            "parcial1": float(nota.parcial1) if nota.parcial1 is not None else None,
-            "parcial2": float(nota.parcial2) if nota.parcial2 is not None else None,
+            # Evaluaciones semanales, prácticas y parciales
+            **valores_nota(nota),
             
             # Promedio calculado
-            "promedio_final": float(promedio) if promedio is not None else None,
-            
-            # Fechas
-            "created_at": nota.created_at,
-            "updated_at": nota.updated_at
+            "promedio_evaluaciones": None,
+            "promedio_practicas": None,
+            "promedio_parciales": None,
+            "promedio_final": _a_float(promedio),
+            "estado": None,
+            "fecha_registro": nota.fecha_registro,
+            "observaciones": nota.observaciones
         }
         
         return [nota_data]
@@ -485,7 +506,7 @@ def get_student_grades_by_course(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_student_grades_by_course: {e}")
+        logger.exception("Error in get_student_grades_by_course")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener las calificaciones del curso"
@@ -510,43 +531,39 @@ def get_student_final_grades(
         if ciclo_id:
             matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
         
-        matriculas_activas = matriculas_query.all()
-        
-        # Obtener cursos de los ciclos en los que está matriculado
-        ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
-        
-        if not ciclo_ids:
-            return []
+        # Ciclos matriculados como subconsulta (sin cargar las matrículas)
+        ciclos_matriculados = matriculas_query.with_entities(Matricula.ciclo_id).scalar_subquery()
         
         # Obtener notas
         notas = db.query(Nota).join(Curso).filter(
             Nota.estudiante_id == current_user.id,
-            Curso.ciclo_id.in_(ciclo_ids)
+            Curso.ciclo_id.in_(ciclos_matriculados)
         ).options(
-            joinedload(Nota.curso).joinedload(Curso.docente),
-            joinedload(Nota.curso).joinedload(Curso.ciclo)
+            contains_eager(Nota.curso).selectinload(Curso.docente),
+            contains_eager(Nota.curso).selectinload(Curso.ciclo)
         ).all()
         
+        # Promedios y detalle de todos los cursos en una sola pasada sobre las notas ya cargadas
+        promedios = GradeCalculator.calcular_promedios_por_cursos(
+            current_user.id, [nota.curso_id for nota in notas], db, notas=notas
+        )
+        
         # Convertir a formato de respuesta
-        promedios_response = []
-        for nota in notas:
-            promedio = GradeCalculator.calcular_promedio_nota(nota)
-            
-            promedio_data = {
+        return [
+            {
                 "curso_id": nota.curso_id,
                 "curso_nombre": nota.curso.nombre,
-                "docente_nombre": f"{nota.curso.docente.first_name} {nota.curso.docente.last_name}",
+                "docente_nombre": nota.curso.docente.full_name if nota.curso.docente else "Sin asignar",
                 "ciclo_nombre": nota.curso.ciclo.nombre,
-                "promedio_final": float(promedio) if promedio is not None else None,
-                "estado": "APROBADO" if promedio and float(promedio) >= 13 else "DESAPROBADO" if promedio else "PENDIENTE"
+                "promedio_final": _a_float(promedios[nota.curso_id]['promedio_final']),
+                "estado": promedios[nota.curso_id]['estado'],
+                "detalle": _detalle_float(promedios[nota.curso_id]['detalle'])
             }
-            
-            promedios_response.append(promedio_data)
-        
-        return promedios_response
+            for nota in notas
+        ]
         
     except Exception as e:
-        print(f"Error in get_student_final_grades: {e}")
+        logger.exception("Error in get_student_final_grades")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener los promedios finales"
@@ -561,50 +578,29 @@ def get_student_final_grade_by_course(
     """Obtener promedio final del estudiante para un curso específico"""
     
     try:
-        # Verificar que el estudiante esté matriculado en el curso
-        matricula = db.query(Matricula).join(Curso).filter(
-            Matricula.estudiante_id == current_user.id,
-            Curso.id == curso_id,
-            Matricula.is_active == True
-        ).first()
-        
-        if not matricula:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No estás matriculado en este curso"
-            )
-        
-        # Obtener nota del curso
-        nota = db.query(Nota).filter(
-            Nota.estudiante_id == current_user.id,
-            Nota.curso_id == curso_id
-        ).options(
-            joinedload(Nota.curso).joinedload(Curso.docente),
-            joinedload(Nota.curso).joinedload(Curso.ciclo)
-        ).first()
-        
-        if not nota:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No se encontraron calificaciones para este curso"
-            )
+        # Matrícula en el ciclo del curso y nota del curso (una sola consulta)
+        nota = _nota_curso_matriculado(db, current_user.id, curso_id)
         
         # Calcular promedio
-        promedio = GradeCalculator.calcular_promedio_nota(nota)
+        resultado = GradeCalculator.calcular_promedios_por_cursos(
+            current_user.id, [curso_id], db, notas=[nota]
+        )[curso_id]
+        promedio = resultado['promedio_final']
         
         return {
             "curso_id": nota.curso_id,
             "curso_nombre": nota.curso.nombre,
-            "docente_nombre": f"{nota.curso.docente.first_name} {nota.curso.docente.last_name}",
+            "docente_nombre": nota.curso.docente.full_name if nota.curso.docente else "Sin asignar",
             "ciclo_nombre": nota.curso.ciclo.nombre,
-            "promedio_final": float(promedio) if promedio is not None else None,
-            "estado": "APROBADO" if promedio and float(promedio) >= 13 else "DESAPROBADO" if promedio else "PENDIENTE"
+            "promedio_final": _a_float(promedio),
+            "estado": resultado['estado'],
+            "detalle": _detalle_float(resultado['detalle'])
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_student_final_grade_by_course: {e}")
+        logger.exception("Error in get_student_final_grade_by_course")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener el promedio final del curso"
@@ -619,65 +615,18 @@ def get_student_grades_by_type(
     """Obtener calificaciones del estudiante agrupadas por tipo (evaluaciones, prácticas, parciales)"""
     
     try:
-        # Verificar que el estudiante esté matriculado en el curso
-        matricula = db.query(Matricula).join(Curso).filter(
-            Matricula.estudiante_id == current_user.id,
-            Curso.id == curso_id,
-            Matricula.is_active == True
-        ).first()
-        
-        if not matricula:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No estás matriculado en este curso"
-            )
-        
-        # Obtener nota del curso
-        nota = db.query(Nota).filter(
-            Nota.estudiante_id == current_user.id,
-            Nota.curso_id == curso_id
-        ).options(
-            joinedload(Nota.curso)
-        ).first()
-        
-        if not nota:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No se encontraron calificaciones para este curso"
-            )
-        
-        # Agrupar notas por tipo
-        evaluaciones = []
-        for i in range(1, 9):
-            eval_attr = f"evaluacion{i}"
-            eval_value = getattr(nota, eval_attr)
-            if eval_value is not None:
-                evaluaciones.append({
-                    "numero": i,
-                    "nota": float(eval_value),
-                    "tipo": f"Evaluación {i}"
-                })
-        
-        practicas = []
-        for i in range(1, 5):
-            prac_attr = f"practica{i}"
-            prac_value = getattr(nota, prac_attr)
-            if prac_value is not None:
-                practicas.append({
-                    "numero": i,
-                    "nota": float(prac_value),
-                    "tipo": f"Práctica {i}"
-                })
-        
-        parciales = []
-        for i in range(1, 3):
-            parc_attr = f"parcial{i}"
-            parc_value = getattr(nota, parc_attr)
-            if parc_value is not None:
-                parciales.append({
-                    "numero": i,
-                    "nota": float(parc_value),
-                    "tipo": f"Parcial {i}"
+        # Matrícula en el ciclo del curso y nota del curso (una sola consulta)
+        nota = _nota_curso_matriculado(db, current_user.id, curso_id)
+        
+        # Agrupar notas por tipo en una sola pasada sobre las columnas
+        grupos = {"evaluaciones_semanales": [], "evaluaciones_practicas": [], "evaluaciones_parciales": []}
+        for campo, grupo, numero, tipo in _CAMPOS_POR_TIPO:
+            valor = getattr(nota, campo)
+            if valor is not None:
+                grupos[grupo].append({
+                    "numero": numero,
+                    "nota": float(valor),
+                    "tipo": tipo
                 })
         
         # Calcular promedio final
@@ -686,16 +635,15 @@ def get_student_grades_by_type(
         return {
             "curso_id": curso_id,
             "curso_nombre": nota.curso.nombre,
-            "evaluaciones": evaluaciones,
-            "practicas": practicas,
-            "parciales": parciales,
-            "promedio_final": float(promedio_final) if promedio_final is not None else None
+            **grupos,
+            "promedio_final": _a_float(promedio_final),
+            "estado": None
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_student_grades_by_type: {e}")
+        logger.exception("Error in get_student_grades_by_type")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener las calificaciones por tipo"
@@ -720,7 +668,7 @@ def get_student_courses_with_grades(
         if ciclo_id:
             matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
         
-        matriculas_activas = matriculas_query.all()
+        matriculas_activas = matriculas_query.options(load_only(Matricula.ciclo_id)).all()
         
         # Obtener cursos de los ciclos en los que está matriculado
         ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
@@ -733,41 +681,38 @@ def get_student_courses_with_grades(
             Curso.ciclo_id.in_(ciclo_ids),
             Curso.is_active == True
         ).options(
-            joinedload(Curso.ciclo),
-            joinedload(Curso.docente)
+            selectinload(Curso.ciclo),
+            selectinload(Curso.docente)
         ).all()
         
+        # Notas del estudiante en todos los cursos en una sola consulta (una nota por curso)
+        curso_ids = [curso.id for curso in cursos]
+        notas = db.query(Nota).filter(
+            Nota.estudiante_id == current_user.id,
+            Nota.curso_id.in_(curso_ids)
+        ).options(raiseload('*')).all() if curso_ids else []
+        notas_por_curso = {nota.curso_id: nota for nota in notas}
+        
+        # Promedios de todos los cursos reutilizando las notas ya cargadas
+        promedios = GradeCalculator.calcular_promedios_por_cursos(current_user.id, curso_ids, db, notas=notas)
+        
         # Convertir a formato de respuesta
-        cursos_response = []
-        for curso in cursos:
-            # Obtener nota del estudiante para este curso
-            nota = db.query(Nota).filter(
-                Nota.estudiante_id == current_user.id,
-                Nota.curso_id == curso.id
-            ).first()
-            
-            # Calcular promedio si existe la nota
-            promedio_final = None
-            if nota:
-                promedio_final = GradeCalculator.calcular_promedio_nota(nota)
-            
-            curso_data = {
+        return [
+            {
                 "id": curso.id,
                 "nombre": curso.nombre,
-                "docente_nombre": f"{curso.docente.first_name} {curso.docente.last_name}",
+                "docente_nombre": curso.docente.full_name if curso.docente else "Sin asignar",
                 "ciclo_nombre": curso.ciclo.nombre,
                 "ciclo_año": curso.ciclo.año,
-                "promedio_final": float(promedio_final) if promedio_final is not None else None,
-                "estado": "APROBADO" if promedio_final and float(promedio_final) >= 13 else "DESAPROBADO" if promedio_final else "PENDIENTE",
-                "tiene_notas": nota is not None
+                "promedio_final": _a_float(promedios[curso.id]['promedio_final']),
+                "estado": promedios[curso.id]['estado'],
+                "tiene_notas": curso.id in notas_por_curso
             }
-            
-            cursos_response.append(curso_data)
-        
-        return cursos_response
+            for curso in cursos
+        ]
         
     except Exception as e:
-        print(f"Error in get_student_courses_with_grades: {e}")
+        logger.exception("Error in get_student_courses_with_grades")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener los cursos con calificaciones"
@@ -826,7 +771,7 @@ def get_evaluation_description(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_evaluation_description: {e}")
+        logger.exception("Error in get_evaluation_description")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener la descripción de la evaluación"
@@ -1,12 +1,19 @@
 """
 Modelos para el módulo de estudiante
 """
+from sqlalchemy import func
+
 from app.shared import (
     User, RoleEnum, Carrera, Ciclo, Curso, 
     Matricula, Nota, HistorialNota, DescripcionEvaluacion
 )
 
+# Nombre del docente de un curso calculado en SQL, para consultas por columnas
+# con .outerjoin(User, Curso.docente_id == User.id)
+DOCENTE_NOMBRE = func.coalesce(User.full_name, "Sin asignar").label("docente_nombre")
+
 __all__ = [
     "User", "RoleEnum", "Carrera", "Ciclo", 
-    "Curso", "Matricula", "Nota", "HistorialNota", "DescripcionEvaluacion"
+    "Curso", "Matricula", "Nota", "HistorialNota", "DescripcionEvaluacion",
+    "DOCENTE_NOMBRE"
 ]
\ No newline at end of file
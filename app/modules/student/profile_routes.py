@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional
+import logging
 
 from ...database import get_db
 from ..auth.dependencies import get_estudiante_user
@@ -8,6 +9,7 @@ from ..auth.models import User
 from .schemas import EstudianteResponse
 
 router = APIRouter(tags=["Estudiante - Perfil"])
+logger = logging.getLogger(__name__)
 
 @router.get("/profile", response_model=EstudianteResponse)
 def get_student_profile(
@@ -40,7 +42,7 @@ def get_student_profile(
             "fecha_nacimiento": estudiante.fecha_nacimiento,
             "genero": estudiante.genero,
             "estado_civil": estudiante.estado_civil,
-            "nombre_completo": f"{estudiante.first_name} {estudiante.last_name}",
+            "nombre_completo": estudiante.full_name,
             "email": estudiante.email,
             "is_active": estudiante.is_active,
             "created_at": estudiante.created_at,
@@ -52,7 +54,7 @@ def get_student_profile(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_student_profile: {e}")
+        logger.exception("Error in get_student_profile")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener el perfil del estudiante"
@@ -1,22 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, contains_eager, load_only, raiseload
 from typing import List
+import logging
 
 from ...database import get_db
 from ..auth.dependencies import get_estudiante_user
 from ..auth.models import User
-from .models import Ciclo, Curso, Nota
+from .models import Ciclo, Curso, Nota, DOCENTE_NOMBRE
 from .schemas import EstudianteDashboard, RendimientoAcademicoCiclo, RendimientoCicloDetallado
 from ...shared.models import Matricula
-from ...shared.grade_calculator import GradeCalculator
+from ...shared.grade_calculator import (
+    GradeCalculator, get_grade_cache, valores_nota,
+    CAMPOS_EVALUACIONES, CAMPOS_PRACTICAS, CAMPOS_PARCIALES
+)
+from ...shared.cache import DASHBOARD_ESTUDIANTE, cache_por_usuario
+from ...config import settings
 
 # Importar los routers de los módulos separados
-from .grades_routes import router as grades_router
-from .courses_routes import router as courses_router
+from .grades_routes import router as grades_router, _notas_estudiante, _estadisticas_calificaciones
+from .courses_routes import router as courses_router, _matriculas_estudiante
 from .schedule_routes import router as schedule_router
 from .profile_routes import router as profile_router
 
-router = APIRouter(prefix="/student", tags=["Estudiante - Dashboard"])
+# ORJSONResponse también aplica a los sub-routers incluidos más abajo (calificaciones, cursos, ...)
+router = APIRouter(prefix="/student", tags=["Estudiante - Dashboard"], default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+def _estadisticas_vacias():
+    """Estadísticas del dashboard para un estudiante sin cursos ni notas"""
+    return {
+        "total_cursos_carrera": 0,
+        "promedio_general_carrera": 0,
+        "cursos_aprobados_carrera": 0,
+        "cursos_desaprobados_carrera": 0,
+        "cursos_pendientes_carrera": 0,
+        "creditos_completados_carrera": 0
+    }
+
+def _promedio_nota(nota, cache=None):
+    """Promedio final de una nota como float, o None si no existe o no se puede calcular"""
+    if nota is None:
+        return None
+    try:
+        if cache is not None:
+            promedio = GradeCalculator.calcular_promedio_nota_cacheado(nota, cache)
+        else:
+            promedio = GradeCalculator.calcular_promedio_nota(nota)
+    except Exception:
+        return None
+    return float(promedio) if promedio is not None else None
 
 # Endpoint de rendimiento académico con autenticación y cursos detallados
 @router.get("/academic-performance", response_model=List[RendimientoCicloDetallado])
@@ -75,23 +108,10 @@ def get_academic_performance(
                     except Exception as e:
                         promedio_final = None
                     
-                    # Preparar evaluaciones
-                    evaluaciones = {}
-                    for i in range(1, 9):
-                        eval_val = getattr(nota, f'evaluacion{i}')
-                        evaluaciones[f'evaluacion{i}'] = float(eval_val) if eval_val is not None else None
-                    
-                    # Preparar prácticas
-                    practicas = {}
-                    for i in range(1, 5):
-                        prac_val = getattr(nota, f'practica{i}')
-                        practicas[f'practica{i}'] = float(prac_val) if prac_val is not None else None
-                    
-                    # Preparar parciales
-                    parciales = {}
-                    for i in range(1, 3):
-                        parc_val = getattr(nota, f'parcial{i}')
-                        parciales[f'parcial{i}'] = float(parc_val) if parc_val is not None else None
+                    # Preparar evaluaciones, prácticas y parciales
+                    evaluaciones = valores_nota(nota, CAMPOS_EVALUACIONES)
+                    practicas = valores_nota(nota, CAMPOS_PRACTICAS)
+                    parciales = valores_nota(nota, CAMPOS_PARCIALES)
                     
                     # Determinar estado basado en las notas completadas
                     if promedio_final and float(promedio_final) >= 13.0:
@@ -110,9 +130,9 @@ def get_academic_performance(
                 else:
                     # Curso sin notas
                     promedio_final = None
-                    evaluaciones = {f'evaluacion{i}': None for i in range(1, 9)}
-                    practicas = {f'practica{i}': None for i in range(1, 5)}
-                    parciales = {f'parcial{i}': None for i in range(1, 3)}
+                    evaluaciones = dict.fromkeys(CAMPOS_EVALUACIONES)
+                    practicas = dict.fromkeys(CAMPOS_PRACTICAS)
+                    parciales = dict.fromkeys(CAMPOS_PARCIALES)
                     estado = "Pendiente"
                 
                 curso_rendimiento = {
@@ -168,206 +188,198 @@ router.include_router(courses_router)
 router.include_router(schedule_router)
 router.include_router(profile_router)
 
-@router.get("/dashboard", response_model=EstudianteDashboard)
-def get_student_dashboard(
-    current_user: User = Depends(get_estudiante_user),
-    db: Session = Depends(get_db)
-):
-    """Obtener dashboard completo del estudiante - CON CAMPOS CORRECTOS"""
-    
-    try:
-        # Información básica del estudiante
-        estudiante_info = {
-            "first_name": current_user.first_name,
-            "last_name": current_user.last_name,
-            "email": current_user.email,
-            "dni": current_user.dni
-        }
-
-        # Obtener la última matrícula del estudiante para determinar el ciclo actual
-        latest_matricula = db.query(Matricula).join(Ciclo).filter(
-            Matricula.estudiante_id == current_user.id
-        ).order_by(Ciclo.numero.desc()).first()
+def _dashboard_estudiante(current_user: User, db: Session, grade_cache: dict):
+    """Dashboard completo del estudiante (compartido por /dashboard y /bundle)"""
+    # Información básica del estudiante
+    estudiante_info = {
+        "first_name": current_user.first_name,
+        "last_name": current_user.last_name,
+        "email": current_user.email,
+        "dni": current_user.dni,
+        "codigo_estudiante": None
+    }
 
-        ciclo_actual = latest_matricula.ciclo if latest_matricula else None
-
-        if not ciclo_actual:
-            return {
-                "estudiante_info": estudiante_info,
-                "cursos_actuales": [],
-                "notas_recientes": [],
-                "estadisticas": {
-                    "total_cursos": 0,
-                    "promedio_general": 0,
-                    "cursos_aprobados": 0,
-                    "cursos_desaprobados": 0,
-                    "creditos_completados": 0
-                }
-            }
+    # Obtener la última matrícula del estudiante para determinar el ciclo actual
+    latest_matricula = db.query(Matricula).join(Ciclo).options(
+        contains_eager(Matricula.ciclo)
+    ).filter(
+        Matricula.estudiante_id == current_user.id
+    ).order_by(Ciclo.numero.desc()).first()
 
-        # Cursos actuales basados en el ciclo de la última matrícula
-        cursos_actuales = db.query(Curso).options(joinedload(Curso.docente)).filter(
-            Curso.ciclo_id == ciclo_actual.id
-        ).all()
+    ciclo_actual = latest_matricula.ciclo if latest_matricula else None
 
-        cursos_formateados = []
-        calculator = GradeCalculator()
-        for curso in cursos_actuales:
-            # Obtener la nota del estudiante para el curso actual
-            nota = db.query(Nota).filter(
-                Nota.estudiante_id == current_user.id,
-                Nota.curso_id == curso.id
-            ).first()
+    # Sin matrículas no hay cursos ni notas: se responde sin más consultas
+    if not ciclo_actual:
+        return {
+            "estudiante_info": estudiante_info,
+            "cursos_actuales": [],
+            "notas_recientes": [],
+            "estadisticas": _estadisticas_vacias()
+        }
 
-            promedio_curso = None
-            if nota:
-                try:
-                    # Usar el calculador para obtener el promedio
-                    promedio_curso = calculator.calcular_promedio_final(nota)
-                except Exception:
-                    promedio_curso = None
-            
-            # Se mantienen los campos del schema original para evitar errores de validación,
-            # y se agrega el promedio. El frontend deberá ser ajustado para mostrarlo.
-            cursos_formateados.append({
-                "id": curso.id,
-                "nombre": curso.nombre,
-                "docente_nombre": f"{curso.docente.first_name} {curso.docente.last_name}" if curso.docente else "Sin asignar",
-                "ciclo_nombre": ciclo_actual.nombre,
-                "creditos": 3,  # Asumiendo un valor por defecto
-                "promedio_final": float(promedio_curso) if promedio_curso is not None else None
-            })
+    # Cursos actuales basados en el ciclo de la última matrícula
+    cursos_actuales = db.query(Curso.id, Curso.nombre, DOCENTE_NOMBRE).outerjoin(
+        User, Curso.docente_id == User.id
+    ).filter(
+        Curso.ciclo_id == ciclo_actual.id
+    ).all()
+    cursos_por_id = {curso.id: curso for curso in cursos_actuales}
 
-        # Notas recientes - VERSIÓN CORREGIDA (SIN JOIN PROBLEMÁTICO)
-        curso_ids = [curso.id for curso in cursos_actuales]
-        notas_recientes = db.query(Nota).filter(
+    # Notas del estudiante en los cursos actuales, indexadas por curso (una sola consulta)
+    curso_ids = [curso.id for curso in cursos_actuales]
+    notas_por_curso = {
+        nota.curso_id: nota
+        for nota in db.query(Nota).filter(
             Nota.estudiante_id == current_user.id,
             Nota.curso_id.in_(curso_ids)
-        ).order_by(Nota.updated_at.desc()).limit(5).all()
-        
-        notas_formateadas = []
-        for nota in notas_recientes:
-            notas_formateadas.append({
-                "id": nota.id,
-                "curso_nombre": nota.curso.nombre,
-                "docente_nombre": f"{nota.curso.docente.first_name} {nota.curso.docente.last_name}" if nota.curso.docente else "Sin asignar",
-                "ciclo_nombre": ciclo_actual.nombre,
-                
-                # SOLO CAMPOS QUE EXISTEN EN EL MODELO
-                "evaluacion1": float(nota.evaluacion1) if nota.evaluacion1 else None,
-                "evaluacion2": float(nota.evaluacion2) if nota.evaluacion2 else None,
-                "evaluacion3": float(nota.evaluacion3) if nota.evaluacion3 else None,
-                "evaluacion4": float(nota.evaluacion4) if nota.evaluacion4 else None,
-                "evaluacion5": float(nota.evaluacion5) if nota.evaluacion5 else None,
-                "evaluacion6": float(nota.evaluacion6) if nota.evaluacion6 else None,
-                "evaluacion7": float(nota.evaluacion7) if nota.evaluacion7 else None,
-                "evaluacion8": float(nota.evaluacion8) if nota.evaluacion8 else None,
-                
-                "practica1": float(nota.practica1) if nota.practica1 else None,
-                "practica2": float(nota.practica2) if nota.practica2 else None,
-                "practica3": float(nota.practica3) if nota.practica3 else None,
-                "practica4": float(nota.practica4) if nota.practica4 else None,
-                
-                "parcial1": float(nota.parcial1) if nota.parcial1 else None,
-                "parcial2": float(nota.parcial2) if nota.parcial2 else None,
-                
-                # Calcular promedio final usando el método del modelo
-                "promedio_final": float(nota.calcular_promedio_final()) if nota.calcular_promedio_final() else None,
-                "estado": nota.obtener_estado(),
-                "fecha_actualizacion": nota.updated_at.isoformat() if nota.updated_at else nota.created_at.isoformat()
-            })
+        ).options(raiseload('*')).all()
+    } if curso_ids else {}
 
-        # CALCULAR ESTADÍSTICAS DE TODOS LOS CICLOS (APROBADOS Y DESAPROBADOS A LO LARGO DE TODA LA CARRERA)
-        # Obtener todas las matrículas activas del estudiante
-        matriculas_activas = db.query(Matricula).filter(
-            Matricula.estudiante_id == current_user.id,
-            Matricula.is_active == True
-        ).all()
-        
-        # Obtener cursos de todos los ciclos en los que está matriculado
-        ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
-        
-        cursos_todos_ciclos = []
-        if ciclo_ids:
-            cursos_todos_ciclos = db.query(Curso).filter(
-                Curso.ciclo_id.in_(ciclo_ids)
-            ).all()
-        
-        # Calcular estadísticas de todos los ciclos usando GradeCalculator
-        cursos_aprobados_todos_ciclos = 0
-        cursos_desaprobados_todos_ciclos = 0
-        cursos_pendientes_todos_ciclos = 0
-        promedios_todos_ciclos = []
-        
-        for curso in cursos_todos_ciclos:
-            # Obtener notas del curso
-            notas_curso = db.query(Nota).filter(
-                Nota.estudiante_id == current_user.id,
-                Nota.curso_id == curso.id
-            ).all()
+    # Promedio de cada curso actual, calculado una vez para cursos y notas recientes
+    promedios_actuales = {
+        curso_id: _promedio_nota(nota, grade_cache)
+        for curso_id, nota in notas_por_curso.items()
+    }
+
+    # Se mantienen los campos del schema original para evitar errores de validación,
+    # y se agrega el promedio. El frontend deberá ser ajustado para mostrarlo.
+    cursos_formateados = [
+        {
+            "id": curso.id,
+            "nombre": curso.nombre,
+            "docente_nombre": curso.docente_nombre,
+            "ciclo_nombre": ciclo_actual.nombre,
+            "creditos": GradeCalculator.CREDITOS_POR_CURSO,
+            "promedio_final": promedios_actuales.get(curso.id)
+        }
+        for curso in cursos_actuales
+    ]
+
+    # Notas recientes - se toman de las notas ya cargadas de los cursos actuales
+    notas_recientes = sorted(
+        notas_por_curso.values(),
+        key=lambda nota: nota.updated_at or nota.created_at,
+        reverse=True
+    )[:5]
+    
+    notas_formateadas = []
+    for nota in notas_recientes:
+        curso = cursos_por_id[nota.curso_id]
+        promedio = promedios_actuales[nota.curso_id]
+        notas_formateadas.append({
+            "id": nota.id,
+            "curso_nombre": curso.nombre,
+            "docente_nombre": curso.docente_nombre,
+            "ciclo_nombre": ciclo_actual.nombre,
             
-            if notas_curso:
-                # Usar GradeCalculator para calcular el promedio con los pesos correctos
-                promedio_calculado = None
-                for nota in notas_curso:
-                    try:
-                        promedio_calculado = GradeCalculator.calcular_promedio_nota(nota)
-                        if promedio_calculado is not None:
-                            break
-                    except Exception:
-                        continue
-                
-                if promedio_calculado is not None:
-                    promedio_float = float(promedio_calculado)
-                    promedios_todos_ciclos.append(promedio_float)
-                    
-                    if promedio_float >= 13.0:
-                        cursos_aprobados_todos_ciclos += 1
-                    else:
-                        cursos_desaprobados_todos_ciclos += 1
-                else:
-                    cursos_pendientes_todos_ciclos += 1
-            else:
-                cursos_pendientes_todos_ciclos += 1
-        
-        # Calcular promedio general de todos los ciclos
-        promedio_general_todos_ciclos = round(sum(promedios_todos_ciclos) / len(promedios_todos_ciclos), 2) if promedios_todos_ciclos else 0
+            # SOLO CAMPOS QUE EXISTEN EN EL MODELO (las notas en 0 se muestran como vacías)
+            **{campo: valor or None for campo, valor in valores_nota(nota).items()},
+            
+            # Promedio final (ya calculado para los cursos actuales)
+            "promedio_final": promedio,
+            "estado": "PENDIENTE" if promedio is None else "APROBADO" if promedio >= 13 else "DESAPROBADO",
+            "fecha_actualizacion": nota.updated_at.isoformat() if nota.updated_at else nota.created_at.isoformat()
+        })
+
+    # CALCULAR ESTADÍSTICAS DE TODOS LOS CICLOS (APROBADOS Y DESAPROBADOS A LO LARGO DE TODA LA CARRERA)
+    # Ciclos de todas las matrículas activas del estudiante (subconsulta)
+    ciclos_matriculados = db.query(Matricula.ciclo_id).filter(
+        Matricula.estudiante_id == current_user.id,
+        Matricula.is_active == True
+    ).scalar_subquery()
+    
+    # Obtener cursos de todos los ciclos en los que está matriculado (una sola consulta)
+    cursos_todos_ciclos = db.query(Curso).filter(
+        Curso.ciclo_id.in_(ciclos_matriculados)
+    ).options(load_only(Curso.id)).all()
+    
+    # Calcular estadísticas de todos los ciclos usando GradeCalculator (una sola consulta de notas)
+    promedios_por_curso = GradeCalculator.calcular_promedios_por_cursos(
+        current_user.id, [curso.id for curso in cursos_todos_ciclos], db, cache=grade_cache
+    )
+    
+    cursos_aprobados_todos_ciclos = 0
+    cursos_desaprobados_todos_ciclos = 0
+    cursos_pendientes_todos_ciclos = 0
+    promedios_todos_ciclos = []
+    
+    for resultado in promedios_por_curso.values():
+        if resultado['estado'] == "APROBADO":
+            cursos_aprobados_todos_ciclos += 1
+        elif resultado['estado'] == "DESAPROBADO":
+            cursos_desaprobados_todos_ciclos += 1
+        else:
+            cursos_pendientes_todos_ciclos += 1
         
-        # Calcular créditos completados de todos los ciclos
-        creditos_completados_todos_ciclos = cursos_aprobados_todos_ciclos * 3
+        if resultado['promedio_final'] is not None:
+            promedios_todos_ciclos.append(float(resultado['promedio_final']))
+    
+    # Calcular promedio general de todos los ciclos
+    promedio_general_todos_ciclos = round(sum(promedios_todos_ciclos) / len(promedios_todos_ciclos), 2) if promedios_todos_ciclos else 0
+    
+    # Calcular créditos completados de todos los ciclos
+    creditos_completados_todos_ciclos = cursos_aprobados_todos_ciclos * GradeCalculator.CREDITOS_POR_CURSO
 
-        # DEFINIR LAS ESTADÍSTICAS (SOLO DE TODA LA CARRERA)
-        estadisticas = {
-            "total_cursos_carrera": len(cursos_todos_ciclos),
-            "promedio_general_carrera": promedio_general_todos_ciclos,
-            "cursos_aprobados_carrera": cursos_aprobados_todos_ciclos,
-            "cursos_desaprobados_carrera": cursos_desaprobados_todos_ciclos,
-            "cursos_pendientes_carrera": cursos_pendientes_todos_ciclos,
-            "creditos_completados_carrera": creditos_completados_todos_ciclos
-        }
+    # DEFINIR LAS ESTADÍSTICAS (SOLO DE TODA LA CARRERA)
+    estadisticas = {
+        "total_cursos_carrera": len(cursos_todos_ciclos),
+        "promedio_general_carrera": promedio_general_todos_ciclos,
+        "cursos_aprobados_carrera": cursos_aprobados_todos_ciclos,
+        "cursos_desaprobados_carrera": cursos_desaprobados_todos_ciclos,
+        "cursos_pendientes_carrera": cursos_pendientes_todos_ciclos,
+        "creditos_completados_carrera": creditos_completados_todos_ciclos
+    }
 
-        return {
-            "estudiante_info": estudiante_info,
-            "cursos_actuales": cursos_formateados,
-            "notas_recientes": notas_formateadas,
-            "estadisticas": estadisticas
-        }
+    return {
+        "estudiante_info": estudiante_info,
+        "cursos_actuales": cursos_formateados,
+        "notas_recientes": notas_formateadas,
+        "estadisticas": estadisticas
+    }
 
-    except Exception as e:
+@router.get("/dashboard", response_model=None, responses={200: {"model": EstudianteDashboard}})
+@cache_por_usuario(expire=settings.dashboard_cache_ttl, namespace=DASHBOARD_ESTUDIANTE)
+def get_student_dashboard(
+    current_user: User = Depends(get_estudiante_user),
+    db: Session = Depends(get_db),
+    grade_cache: dict = Depends(get_grade_cache)
+):
+    """Obtener dashboard completo del estudiante - CON CAMPOS CORRECTOS"""
+    
+    try:
+        return _dashboard_estudiante(current_user, db, grade_cache)
+        
+    except Exception:
+        # Sin respuesta de respaldo: @cache la guardaría durante todo el TTL
+        logger.exception("Error in get_student_dashboard")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener el dashboard del estudiante"
+        )
+
+@router.get("/bundle", response_model=None)
+def get_student_bundle(
+    current_user: User = Depends(get_estudiante_user),
+    db: Session = Depends(get_db),
+    grade_cache: dict = Depends(get_grade_cache)
+):
+    """
+    Dashboard, calificaciones, matrículas y estadísticas en una sola petición: una sola
+    autenticación y una sola sesión de BD para la carga inicial del frontend.
+    Cada sección tiene el mismo contenido que su endpoint individual.
+    """
+    
+    try:
         return {
-            "estudiante_info": {
-                "first_name": current_user.first_name,
-                "last_name": current_user.last_name,
-                "email": current_user.email,
-                "dni": current_user.dni
-            },
-            "cursos_actuales": [],
-            "notas_recientes": [],
-            "estadisticas": {
-                "total_cursos": 0,
-                "promedio_general": 0,
-                "cursos_aprobados": 0,
-                "cursos_desaprobados": 0,
-                "creditos_completados": 0
-            }
-        }
\ No newline at end of file
+            "dashboard": _dashboard_estudiante(current_user, db, grade_cache),
+            "calificaciones": _notas_estudiante(current_user, db),
+            "matriculas": _matriculas_estudiante(current_user, db),
+            "estadisticas": _estadisticas_calificaciones(current_user, db)
+        }
+        
+    except Exception:
+        logger.exception("Error in get_student_bundle")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener los datos del estudiante"
+        )
\ No newline at end of file
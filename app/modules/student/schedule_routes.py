@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, load_only
 from typing import List, Optional
+import logging
 
 from ...database import get_db
 from ..auth.dependencies import get_estudiante_user
 from ..auth.models import User
-from .models import Carrera, Ciclo, Curso, Matricula
+from .models import Carrera, Ciclo, Curso, Matricula, DOCENTE_NOMBRE
 
 router = APIRouter(tags=["Estudiante - Horario"])
+logger = logging.getLogger(__name__)
 
 @router.get("/schedule")
 def get_student_schedule(
@@ -32,7 +34,7 @@ def get_student_schedule(
         if ciclo_id:
             matriculas_query = matriculas_query.filter(Matricula.ciclo_id == ciclo_id)
         
-        matriculas_activas = matriculas_query.all()
+        matriculas_activas = matriculas_query.options(load_only(Matricula.ciclo_id)).all()
         
         # Obtener cursos de los ciclos en los que está matriculado
         ciclo_ids = [matricula.ciclo_id for matricula in matriculas_activas]
@@ -40,34 +42,41 @@ def get_student_schedule(
         if not ciclo_ids:
             return []
         
-        cursos = db.query(Curso).filter(
+        cursos = db.query(
+            Curso.id,
+            Curso.nombre,
+            DOCENTE_NOMBRE,
+            Ciclo.nombre.label("ciclo_nombre"),
+            Ciclo.año.label("ciclo_año"),
+            Carrera.nombre.label("carrera_nombre")
+        ).join(
+            Ciclo, Curso.ciclo_id == Ciclo.id
+        ).join(
+            Carrera, Ciclo.carrera_id == Carrera.id
+        ).outerjoin(
+            User, Curso.docente_id == User.id
+        ).filter(
             Curso.ciclo_id.in_(ciclo_ids),
             Curso.is_active == True
-        ).options(
-            joinedload(Curso.ciclo).joinedload(Ciclo.carrera),
-            joinedload(Curso.docente)
         ).all()
         
         # Convertir a formato de horario
-        horario_response = []
-        for curso in cursos:
-            horario_data = {
+        return [
+            {
                 "id": curso.id,
                 "curso_nombre": curso.nombre,
-                "docente_nombre": f"{curso.docente.first_name} {curso.docente.last_name}",
-                "ciclo_nombre": curso.ciclo.nombre,
-                "ciclo_año": curso.ciclo.año,
+                "docente_nombre": curso.docente_nombre,
+                "ciclo_nombre": curso.ciclo_nombre,
+                "ciclo_año": curso.ciclo_año,
                 "horario": None,  # Campo no implementado aún
                 "aula": None,     # Campo no implementado aún
-                "carrera_nombre": curso.ciclo.carrera.nombre if curso.ciclo.carrera else None
+                "carrera_nombre": curso.carrera_nombre
             }
-            
-            horario_response.append(horario_data)
-        
-        return horario_response
+            for curso in cursos
+        ]
         
     except Exception as e:
-        print(f"Error in get_student_schedule: {e}")
+        logger.exception("Error in get_student_schedule")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al obtener el horario del estudiante"
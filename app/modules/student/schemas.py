@@ -17,6 +17,7 @@ class CursoDashboard(BaseModel):
     docente_nombre: str
     ciclo_nombre: str
     creditos: Optional[int] = 3
+    promedio_final: Optional[float] = None  # None si el curso aún no tiene promedio
 
 class NotaDashboard(BaseModel):
     """Esquema simplificado para el dashboard - USANDO CAMPOS REALES"""
@@ -162,9 +163,9 @@ class PromedioFinalEstudianteResponse(BaseModel):
     """Promedio final del estudiante en un curso"""
     curso_id: int
     curso_nombre: str
-    promedio_final: Decimal
-    estado: str  # APROBADO, DESAPROBADO, SIN_NOTAS
-    detalle: dict
+    promedio_final: Optional[float] = None  # None mientras falte alguna categoría de notas
+    estado: str  # APROBADO, DESAPROBADO, PENDIENTE
+    detalle: Dict[str, Optional[float]]
     
     class Config:
         from_attributes = True
@@ -239,17 +240,23 @@ class NotaDetalladaResponse(BaseModel):
     class Config:
         from_attributes = True
       
+class NotaPorTipo(BaseModel):
+    """Una nota registrada dentro de su tipo de evaluación"""
+    numero: int
+    nota: float
+    tipo: str
+
 class NotasPorTipoResponse(BaseModel):
     """Notas agrupadas por tipo de evaluación - SISTEMA NUEVO"""
     curso_id: int
     curso_nombre: str
     
-    # Notas agrupadas por tipo
-    evaluaciones_semanales: List[NotaEstudianteResponse] = Field(default_factory=list)
-    evaluaciones_practicas: List[NotaEstudianteResponse] = Field(default_factory=list)
-    evaluaciones_parciales: List[NotaEstudianteResponse] = Field(default_factory=list)
+    # Notas agrupadas por tipo (solo las registradas)
+    evaluaciones_semanales: List[NotaPorTipo] = Field(default_factory=list)
+    evaluaciones_practicas: List[NotaPorTipo] = Field(default_factory=list)
+    evaluaciones_parciales: List[NotaPorTipo] = Field(default_factory=list)
     
-    promedio_final: Optional[Decimal] = None
+    promedio_final: Optional[float] = None
     estado: Optional[str] = None
     
     class Config:
@@ -268,7 +275,7 @@ class EstudianteDashboard(BaseModel):
 class EstadisticasEstudiante(BaseModel):
     """Estadísticas del rendimiento del estudiante"""
     total_cursos: int
-    promedio_general: Optional[Decimal] = None
+    promedio_general: Optional[float] = None
     cursos_aprobados: int
     cursos_desaprobados: int
     creditos_completados: int
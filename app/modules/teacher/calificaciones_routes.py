@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, and_
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 import pandas as pd
 import io
@@ -14,6 +15,7 @@ from ..auth.models import User, RoleEnum
 from .models import Carrera, Ciclo, Curso, Matricula, Nota, HistorialNota, DescripcionEvaluacion
 from app.shared import email_service
 from ...shared.grade_calculator import GradeCalculator
+from ...shared.cache import invalidar_cache_estudiante, invalidar_cache_docente
 from .schemas import (
     NotaCreate, NotaUpdate, NotaDocenteResponse, ActualizacionMasivaNotas,
     NotaResponse, PromedioFinalResponse, EstructuraNotasResponse, NotaMasivaCreate,
@@ -46,8 +48,10 @@ def get_course_grades(
             detail="Curso no encontrado o no pertenece al docente"
         )
 
-    # Construir query base - ahora solo un registro por estudiante
-    query = db.query(Nota).join(User, User.id == Nota.estudiante_id).filter(
+    # Construir query base - ahora solo un registro por estudiante, con el nombre del estudiante del mismo JOIN
+    query = db.query(Nota, User.full_name.label("estudiante_nombre")).join(
+        User, User.id == Nota.estudiante_id
+    ).filter(
         Nota.curso_id == curso_id
     )
 
@@ -57,44 +61,45 @@ def get_course_grades(
 
     notas = query.order_by(User.last_name, User.first_name).all()
 
-    # Formatear respuesta
+    # Formatear respuesta - los datos vienen de la BD, model_construct evita validarlos
+    # dos veces (FastAPI vuelve a validar contra response_model al serializar)
     notas_data = []
-    for nota in notas:
-        estudiante = nota.estudiante
-        notas_data.append(NotaResponse(
+    for nota, estudiante_nombre in notas:
+        promedio_final = nota.calcular_promedio_final()
+        notas_data.append(NotaResponse.model_construct(
             id=nota.id,
-            estudiante_id=estudiante.id,
-            estudiante_nombre=f"{estudiante.first_name} {estudiante.last_name}",
+            estudiante_id=nota.estudiante_id,
+            estudiante_nombre=estudiante_nombre,
             curso_id=nota.curso_id,
             
             # Campos de evaluaciones
-            evaluacion1=float(nota.evaluacion1) if nota.evaluacion1 else None,
-            evaluacion2=float(nota.evaluacion2) if nota.evaluacion2 else None,
-            evaluacion3=float(nota.evaluacion3) if nota.evaluacion3 else None,
-            evaluacion4=float(nota.evaluacion4) if nota.evaluacion4 else None,
-            evaluacion5=float(nota.evaluacion5) if nota.evaluacion5 else None,
-            evaluacion6=float(nota.evaluacion6) if nota.evaluacion6 else None,
-            evaluacion7=float(nota.evaluacion7) if nota.evaluacion7 else None,
-            evaluacion8=float(nota.evaluacion8) if nota.evaluacion8 else None,
+            evaluacion1=nota.evaluacion1 or None,
+            evaluacion2=nota.evaluacion2 or None,
+            evaluacion3=nota.evaluacion3 or None,
+            evaluacion4=nota.evaluacion4 or None,
+            evaluacion5=nota.evaluacion5 or None,
+            evaluacion6=nota.evaluacion6 or None,
+            evaluacion7=nota.evaluacion7 or None,
+            evaluacion8=nota.evaluacion8 or None,
             
             # Campos de prácticas
-            practica1=float(nota.practica1) if nota.practica1 else None,
-            practica2=float(nota.practica2) if nota.practica2 else None,
-            practica3=float(nota.practica3) if nota.practica3 else None,
-            practica4=float(nota.practica4) if nota.practica4 else None,
+            practica1=nota.practica1 or None,
+            practica2=nota.practica2 or None,
+            practica3=nota.practica3 or None,
+            practica4=nota.practica4 or None,
             
             # Campos de parciales
-            parcial1=float(nota.parcial1) if nota.parcial1 else None,
-            parcial2=float(nota.parcial2) if nota.parcial2 else None,
+            parcial1=nota.parcial1 or None,
+            parcial2=nota.parcial2 or None,
             
             # Resultados calculados
             promedio_evaluaciones=GradeCalculator.calcular_promedio_evaluaciones(nota),
             promedio_practicas=GradeCalculator.calcular_promedio_practicas(nota),
             promedio_parciales=GradeCalculator.calcular_promedio_parciales(nota),
-            promedio_final=nota.calcular_promedio_final(),
-            estado=nota.obtener_estado(),
+            promedio_final=promedio_final,
+            estado=nota.obtener_estado(promedio_final),
             
-            fecha_registro=nota.fecha_registro.isoformat(),
+            fecha_evaluacion=nota.fecha_registro,
             observaciones=nota.observaciones,
             created_at=nota.created_at,
             updated_at=nota.updated_at
@@ -141,8 +146,7 @@ def update_grade(
         nota.valor_nota = nota_data.valor_nota
     
     if nota_data.fecha_evaluacion is not None:
-        from datetime import datetime
-        nota.fecha_evaluacion = datetime.strptime(nota_data.fecha_evaluacion, "%Y-%m-%d").date()
+        nota.fecha_evaluacion = date.fromisoformat(nota_data.fecha_evaluacion)
     
     if nota_data.observaciones is not None:
         nota.observaciones = nota_data.observaciones
@@ -159,12 +163,14 @@ def update_grade(
         nota_anterior=valor_anterior,
         nota_nueva=nota.valor_nota,
         tipo_cambio="ACTUALIZACION",
-        observaciones=f"Nota actualizada por {current_user.first_name} {current_user.last_name}"
+        observaciones=f"Nota actualizada por {current_user.full_name}"
     )
     
     db.add(historial)
     db.commit()
     db.refresh(nota)
+    invalidar_cache_estudiante(nota.estudiante_id)
+    invalidar_cache_docente(current_user.id)
     
     return {
         "id": nota.id,
@@ -203,13 +209,20 @@ def update_grades_bulk(
     updated_count = 0
     errors = []
     
+    # Notas existentes del curso para los estudiantes enviados, en una sola consulta
+    estudiante_ids = {nota_data.estudiante_id for nota_data in grades_data.notas}
+    notas_por_estudiante = {
+        nota.estudiante_id: nota
+        for nota in db.query(Nota).filter(
+            Nota.curso_id == curso_id,
+            Nota.estudiante_id.in_(estudiante_ids)
+        )
+    } if estudiante_ids else {}
+    
     for nota_data in grades_data.notas:
         try:
-            # Buscar si ya existe una nota para este estudiante y curso
-            nota_existente = db.query(Nota).filter(
-                Nota.estudiante_id == nota_data.estudiante_id,
-                Nota.curso_id == curso_id
-            ).first()
+            # Nota existente para este estudiante y curso (incluye las creadas en esta misma petición)
+            nota_existente = notas_por_estudiante.get(nota_data.estudiante_id)
             
             if nota_existente:
                 # Actualizar nota existente
@@ -250,13 +263,13 @@ def update_grades_bulk(
                 
                 # Crear registro en historial
                 historial = HistorialNota(
-                    nota_id=nota_existente.id,
+                    nota=nota_existente,
                     estudiante_id=nota_existente.estudiante_id,
                     curso_id=nota_existente.curso_id,
                     nota_anterior=None,  # Para actualizaciones masivas, no guardamos el valor anterior completo
                     nota_nueva=float(promedio_actual) if promedio_actual is not None else 0.0,
                     motivo_cambio="ACTUALIZACION_MASIVA",
-                    usuario_modificacion=f"{current_user.first_name} {current_user.last_name}"
+                    usuario_modificacion=current_user.full_name
                 )
                 
                 db.add(historial)
@@ -286,20 +299,20 @@ def update_grades_bulk(
                 )
                 
                 db.add(nueva_nota)
-                db.flush()  # Para obtener el ID
+                notas_por_estudiante[nueva_nota.estudiante_id] = nueva_nota
                 
                 # Calcular promedio de la nueva nota para el historial
                 promedio_nueva = GradeCalculator.calcular_promedio_nota(nueva_nota)
                 
-                # Crear registro en historial
+                # Crear registro en historial (nota_id se asigna al insertar en el commit, sin flush por fila)
                 historial = HistorialNota(
-                    nota_id=nueva_nota.id,
+                    nota=nueva_nota,
                     estudiante_id=nueva_nota.estudiante_id,
                     curso_id=nueva_nota.curso_id,
                     nota_anterior=None,
                     nota_nueva=float(promedio_nueva) if promedio_nueva is not None else 0.0,
                     motivo_cambio="CREACION_MASIVA",
-                    usuario_modificacion=f"{current_user.first_name} {current_user.last_name}"
+                    usuario_modificacion=current_user.full_name
                 )
                 
                 db.add(historial)
@@ -309,6 +322,8 @@ def update_grades_bulk(
             errors.append(f"Error procesando nota para estudiante {nota_data.estudiante_id}: {str(e)}")
     
     db.commit()
+    invalidar_cache_estudiante(*(nota_data.estudiante_id for nota_data in grades_data.notas))
+    invalidar_cache_docente(current_user.id)
     
     return {
         "message": f"Actualización masiva completada",
@@ -388,6 +403,7 @@ def upload_grades_from_excel(
         
         # Procesar cada fila del Excel
         notas_procesadas = []
+        estudiantes_actualizados = []
         errores = []
         
         for index, row in df.iterrows():
@@ -467,6 +483,7 @@ def upload_grades_from_excel(
                         db.add(nueva_nota)
                         accion = 'creada'
                     
+                    estudiantes_actualizados.append(estudiante.id)
                     notas_procesadas.append({
                         'estudiante': f"{nombre} {apellido}",
                         'dni': dni,
@@ -479,6 +496,8 @@ def upload_grades_from_excel(
         
         # Guardar cambios en la base de datos
         db.commit()
+        invalidar_cache_estudiante(*estudiantes_actualizados)
+        invalidar_cache_docente(current_user.id)
         
         resultado = {
             "mensaje": "Archivo Excel procesado exitosamente",
@@ -577,8 +596,6 @@ def download_excel_template(
     output.seek(0)
     
     # Crear respuesta con el archivo
-    from fastapi.responses import StreamingResponse
-    
     return StreamingResponse(
         io.BytesIO(output.read()),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -656,7 +673,7 @@ def save_evaluation_description(
         # Actualizar existente
         descripcion.descripcion = description_data['descripcion']
         if description_data.get('fecha_evaluacion'):
-            descripcion.fecha_evaluacion = datetime.strptime(description_data['fecha_evaluacion'], "%Y-%m-%d").date()
+            descripcion.fecha_evaluacion = date.fromisoformat(description_data['fecha_evaluacion'])
         descripcion.updated_at = datetime.utcnow()
     else:
         # Crear nueva
@@ -664,14 +681,15 @@ def save_evaluation_description(
             curso_id=curso_id,
             tipo_evaluacion=description_data['tipo_evaluacion'],
             descripcion=description_data['descripcion'],
-            fecha_evaluacion=datetime.strptime(description_data['fecha_evaluacion'], "%Y-%m-%d").date() if description_data.get('fecha_evaluacion') else datetime.now().date()
+            fecha_evaluacion=date.fromisoformat(description_data['fecha_evaluacion']) if description_data.get('fecha_evaluacion') else datetime.now().date(),
+            updated_at=None
         )
         db.add(descripcion)
     
-    db.commit()
-    db.refresh(descripcion)
-    
-    return {
+    # El INSERT/UPDATE devuelve id y timestamps (RETURNING); armar la respuesta
+    # antes del commit evita el SELECT extra de db.refresh()
+    db.flush()
+    respuesta = {
         "id": descripcion.id,
         "curso_id": descripcion.curso_id,
         "tipo_evaluacion": descripcion.tipo_evaluacion,
@@ -680,6 +698,9 @@ def save_evaluation_description(
         "created_at": descripcion.created_at.isoformat() if descripcion.created_at else None,
         "updated_at": descripcion.updated_at.isoformat() if descripcion.updated_at else None
     }
+    db.commit()
+    
+    return respuesta
 
 @router.delete("/courses/{curso_id}/evaluation-descriptions/{tipo_evaluacion}")
 def delete_evaluation_description(
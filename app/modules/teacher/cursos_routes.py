@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, raiseload
 from typing import List, Optional
 
 from ...database import get_db
@@ -7,6 +8,8 @@ from ..auth.dependencies import get_docente_user
 from ..auth.models import User, RoleEnum
 from .models import Carrera, Ciclo, Curso, Matricula, Nota
 from ...shared.grade_calculator import GradeCalculator
+from ...shared.cache import CURSOS_DOCENTE, cache_por_usuario
+from ...config import settings
 from .schemas import (
     CursoDocenteResponse, EstudianteEnCurso, EstudianteConNota,
     CicloResponse
@@ -33,6 +36,7 @@ def get_teacher_ciclos(
     return ciclos
 
 @router.get("/courses", response_model=List[CursoDocenteResponse])
+@cache_por_usuario(expire=settings.cursos_cache_ttl, namespace=CURSOS_DOCENTE)
 def get_teacher_courses(
     current_user: User = Depends(get_docente_user),
     db: Session = Depends(get_db),
@@ -40,12 +44,21 @@ def get_teacher_courses(
 ):
     """Obtener cursos del docente"""
     
-    query = db.query(Curso).filter(
+    # Solo las columnas de la respuesta (filas ligeras, sin entidades Curso/Ciclo)
+    query = db.query(
+        Curso.id,
+        Curso.nombre,
+        Curso.ciclo_id,
+        Curso.docente_id,
+        Curso.is_active,
+        Curso.created_at,
+        Ciclo.nombre.label("ciclo_nombre"),
+        Ciclo.fecha_inicio,
+        Ciclo.fecha_fin,
+        Ciclo.año.label("ciclo_año")
+    ).join(Ciclo, Curso.ciclo_id == Ciclo.id).filter(
         Curso.docente_id == current_user.id,
         Curso.is_active == True
-    ).options(
-        joinedload(Curso.ciclo),
-        joinedload(Curso.docente)
     )
     
     if ciclo_id:
@@ -53,31 +66,20 @@ def get_teacher_courses(
     
     cursos = query.all()
     
-    # Convertir a formato de respuesta con información adicional
-    cursos_response = []
-    for curso in cursos:
-        # Contar estudiantes matriculados en el ciclo del curso
-        estudiantes_count = db.query(Matricula).filter(
-            Matricula.ciclo_id == curso.ciclo_id,
+    # Estudiantes matriculados por ciclo, una sola consulta agrupada para todos los cursos
+    ciclo_ids = {curso.ciclo_id for curso in cursos}
+    estudiantes_por_ciclo = dict(
+        db.query(Matricula.ciclo_id, func.count(Matricula.id)).filter(
+            Matricula.ciclo_id.in_(ciclo_ids),
             Matricula.is_active == True
-        ).count()
-        
-        curso_data = {
-            "id": curso.id,
-            "nombre": curso.nombre,
-            "ciclo_id": curso.ciclo_id,
-            "docente_id": curso.docente_id,
-            "is_active": curso.is_active,
-            "created_at": curso.created_at,
-            "ciclo_nombre": curso.ciclo.nombre,
-            "fecha_inicio": curso.ciclo.fecha_inicio,
-            "fecha_fin": curso.ciclo.fecha_fin,
-            "ciclo_año": curso.ciclo.año,
-            "total_estudiantes": estudiantes_count
-        }
-        cursos_response.append(curso_data)
+        ).group_by(Matricula.ciclo_id).all()
+    ) if ciclo_ids else {}
     
-    return cursos_response
+    # Convertir a formato de respuesta con información adicional
+    return [
+        {**curso._asdict(), "total_estudiantes": estudiantes_por_ciclo.get(curso.ciclo_id, 0)}
+        for curso in cursos
+    ]
 
 @router.get("/courses/{curso_id}", response_model=CursoDocenteResponse)
 def get_teacher_course(
@@ -92,7 +94,8 @@ def get_teacher_course(
         Curso.docente_id == current_user.id,
         Curso.is_active == True
     ).options(
-        joinedload(Curso.ciclo)
+        joinedload(Curso.ciclo),
+        raiseload('*')
     ).first()
     
     if not curso:
@@ -102,10 +105,10 @@ def get_teacher_course(
         )
     
     # Contar estudiantes matriculados en el ciclo del curso
-    estudiantes_count = db.query(Matricula).filter(
+    estudiantes_count = db.query(func.count(Matricula.id)).filter(
         Matricula.ciclo_id == curso.ciclo_id,
         Matricula.is_active == True
-    ).count()
+    ).scalar()
     
     return {
         "id": curso.id,
@@ -139,9 +142,15 @@ def get_course_students(
             detail="Curso no encontrado o no tienes permisos para acceder"
         )
     
-    # Obtener estudiantes matriculados en el ciclo del curso
+    # Obtener estudiantes matriculados en el ciclo del curso (solo las columnas de la respuesta)
     estudiantes = db.query(
-        User, Matricula.fecha_matricula
+        User.id,
+        User.dni,
+        User.first_name,
+        User.last_name,
+        User.email,
+        Matricula.fecha_matricula,
+        User.phone
     ).join(
         Matricula, User.id == Matricula.estudiante_id
     ).filter(
@@ -151,19 +160,7 @@ def get_course_students(
     ).all()
     
     # Convertir a formato de respuesta
-    estudiantes_response = []
-    for user, fecha_matricula in estudiantes:
-        estudiantes_response.append({
-            "id": user.id,
-            "dni": user.dni,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "email": user.email,
-            "fecha_matricula": fecha_matricula,
-            "phone": user.phone
-        })
-    
-    return estudiantes_response
+    return [estudiante._asdict() for estudiante in estudiantes]
 
 @router.get("/courses/{curso_id}/students-with-grades", response_model=List[EstudianteConNota])
 def get_course_students_with_grades(
@@ -187,8 +184,8 @@ def get_course_students_with_grades(
             detail="Curso no encontrado o no tienes permisos para acceder"
         )
     
-    # Obtener estudiantes matriculados en el ciclo del curso
-    estudiantes = db.query(User).join(
+    # Obtener estudiantes matriculados en el ciclo del curso, con la fecha de matrícula del mismo JOIN
+    estudiantes = db.query(User, Matricula.fecha_matricula).join(
         Matricula, User.id == Matricula.estudiante_id
     ).filter(
         Matricula.ciclo_id == curso.ciclo_id,
@@ -196,26 +193,25 @@ def get_course_students_with_grades(
         User.role == RoleEnum.ESTUDIANTE
     ).order_by(User.last_name, User.first_name).all()
     
-    # Obtener matrículas para las fechas
-    matriculas = db.query(Matricula).filter(
-        Matricula.ciclo_id == curso.ciclo_id,
-        Matricula.is_active == True
-    ).all()
-    
-    matricula_dict = {m.estudiante_id: m.fecha_matricula for m in matriculas}
+    # Notas del curso de todos los estudiantes en una sola consulta (una por estudiante-curso)
+    notas_por_estudiante = {
+        nota.estudiante_id: nota
+        for nota in db.query(Nota).filter(
+            Nota.curso_id == curso_id,
+            Nota.estudiante_id.in_([estudiante.id for estudiante, _ in estudiantes])
+        )
+    } if estudiantes else {}
     
     # Convertir a formato de respuesta
     estudiantes_response = []
-    for estudiante in estudiantes:
-        # Obtener la nota consolidada del estudiante en este curso (solo una por estudiante-curso)
-        nota = db.query(Nota).filter(
-            Nota.estudiante_id == estudiante.id,
-            Nota.curso_id == curso_id
-        ).first()
+    for estudiante, fecha_matricula in estudiantes:
+        # Nota consolidada del estudiante en este curso
+        nota = notas_por_estudiante.get(estudiante.id)
         
         # Convertir nota a formato mejorado
         notas_data = []
         if nota:
+            promedio_final = nota.calcular_promedio_final()
             nota_dict = {
                 "id": nota.id,
                 "fecha_evaluacion": nota.fecha_registro.isoformat() if nota.fecha_registro else None,
@@ -225,8 +221,8 @@ def get_course_students_with_grades(
                 "promedio_evaluaciones": GradeCalculator.calcular_promedio_evaluaciones(nota),
                 "promedio_practicas": GradeCalculator.calcular_promedio_practicas(nota),
                 "promedio_parciales": GradeCalculator.calcular_promedio_parciales(nota),
-                "promedio_final": nota.calcular_promedio_final(),
-                "estado": nota.obtener_estado()
+                "promedio_final": promedio_final,
+                "estado": nota.obtener_estado(promedio_final)
             }
             
             # Agregar todas las evaluaciones, prácticas y parciales
@@ -256,7 +252,7 @@ def get_course_students_with_grades(
             "first_name": estudiante.first_name,
             "last_name": estudiante.last_name,
             "email": estudiante.email,
-            "fecha_matricula": matricula_dict.get(estudiante.id),
+            "fecha_matricula": fecha_matricula,
             "notas": notas_data
         }
         estudiantes_response.append(estudiante_data)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -6,6 +7,7 @@ from ...database import get_db
 from ..auth.dependencies import get_docente_user
 from ..auth.models import User
 from ..auth.security import verify_password, get_password_hash
+from ...shared.cache import invalidar_cache_docente
 from .schemas import DocenteProfileUpdate, PasswordUpdate
 
 router = APIRouter()
@@ -38,49 +40,36 @@ def update_teacher_profile(
 ):
     """Actualizar perfil del docente"""
     
-    # Verificar si el email ya existe (si se está cambiando)
-    if profile_data.email and profile_data.email != current_user.email:
-        existing_user = db.query(User).filter(User.email == profile_data.email).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El email ya está registrado"
-            )
+    # Solo los campos enviados con valor (DocenteProfileUpdate no permite cambiar el email)
+    cambios = {campo: valor for campo, valor in profile_data.model_dump(exclude_unset=True).items() if valor}
     
-    # Actualizar campos
-    if profile_data.first_name:
-        current_user.first_name = profile_data.first_name
-    if profile_data.last_name:
-        current_user.last_name = profile_data.last_name
-    if profile_data.email:
-        current_user.email = profile_data.email
-    if profile_data.phone:
-        current_user.phone = profile_data.phone
-    if profile_data.especialidad:
-        current_user.especialidad = profile_data.especialidad
-    if profile_data.grado_academico:
-        current_user.grado_academico = profile_data.grado_academico
-    
-    current_user.updated_at = datetime.utcnow()
+    # Respuesta a partir del usuario ya cargado por la dependencia y los cambios (sin refresh tras el commit)
+    usuario = {
+        "id": current_user.id,
+        "dni": current_user.dni,
+        "first_name": current_user.first_name,
+        "last_name": current_user.last_name,
+        "email": current_user.email,
+        "phone": current_user.phone,
+        "especialidad": current_user.especialidad,
+        "grado_academico": current_user.grado_academico,
+        "fecha_ingreso": current_user.fecha_ingreso,
+        "is_active": current_user.is_active,
+        "role": current_user.role,
+        **cambios
+    }
     
+    # Un solo UPDATE de las columnas modificadas
+    db.execute(
+        update(User).where(User.id == current_user.id).values(**cambios, updated_at=datetime.utcnow())
+    )
     db.commit()
-    db.refresh(current_user)
+    # El dashboard cacheado muestra el nombre del docente
+    invalidar_cache_docente(current_user.id)
     
     return {
         "message": "Perfil actualizado correctamente",
-        "user": {
-            "id": current_user.id,
-            "dni": current_user.dni,
-            "first_name": current_user.first_name,
-            "last_name": current_user.last_name,
-            "email": current_user.email,
-            "phone": current_user.phone,
-            "especialidad": current_user.especialidad,
-            "grado_academico": current_user.grado_academico,
-            "fecha_ingreso": current_user.fecha_ingreso,
-            "is_active": current_user.is_active,
-            "role": current_user.role
-        }
+        "user": usuario
     }
 
 @router.put("/change-password")
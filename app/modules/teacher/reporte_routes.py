@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, raiseload
 from sqlalchemy import func, and_, or_, extract
 from typing import List, Optional, Dict, Any
+from collections import defaultdict
 from datetime import datetime, date
 from decimal import Decimal
 
@@ -9,6 +10,7 @@ from ...database import get_db
 from ..auth.dependencies import get_docente_user
 from ..auth.models import User, RoleEnum
 from .models import Carrera, Ciclo, Curso, Matricula, Nota
+from ...shared.grade_calculator import CAMPOS_EVALUACIONES, CAMPOS_PRACTICAS, CAMPOS_PARCIALES, valores_nota
 from .schemas import (
     ReporteRendimientoResponse, ResumenReporteResponse, 
     CursoReporteResponse, EstudianteRendimientoResponse
@@ -16,6 +18,10 @@ from .schemas import (
 
 router = APIRouter()
 
+def _notas_registradas(nota, campos) -> List[float]:
+    """Calificaciones registradas (> 0) de una categoría de la nota, como float"""
+    return [float(valor) for valor in valores_nota(nota, campos).values() if valor is not None and float(valor) > 0]
+
 @router.get("/reports/performance", response_model=Dict[str, Any])
 def get_performance_report(
     año: Optional[int] = Query(None, description="Año para filtrar los cursos"),
@@ -48,7 +54,33 @@ def get_performance_report(
                 Curso.nombre.ilike(f"%{curso_nombre}%")
             )
         
-        cursos = cursos_query.all()
+        cursos = cursos_query.options(
+            joinedload(Curso.ciclo),
+            raiseload('*')
+        ).all()
+        
+        # Notas de los estudiantes matriculados (activos) en el ciclo de cada
+        # curso, en una sola consulta en lugar de una por curso y estudiante
+        notas_por_curso = defaultdict(list)
+        if cursos:
+            filas = db.query(Nota, User).join(
+                Matricula, and_(
+                    Matricula.estudiante_id == Nota.estudiante_id,
+                    Matricula.is_active == True
+                )
+            ).join(
+                Curso, and_(
+                    Curso.id == Nota.curso_id,
+                    Curso.ciclo_id == Matricula.ciclo_id
+                )
+            ).join(
+                User, User.id == Matricula.estudiante_id
+            ).filter(
+                Nota.curso_id.in_([curso.id for curso in cursos])
+            ).options(raiseload('*')).order_by(Matricula.id).all()
+            
+            for nota, estudiante in filas:
+                notas_por_curso[nota.curso_id].append((nota, estudiante))
         
         # Obtener datos de rendimiento por curso
         cursos_data = []
@@ -57,109 +89,79 @@ def get_performance_report(
         estudiantes_aprobados = 0
         
         for curso in cursos:
-            # Obtener estudiantes matriculados en el curso
-            matriculas = db.query(Matricula).filter(
-                Matricula.ciclo_id == curso.ciclo_id,
-                Matricula.is_active == True
-            ).all()
-            
             estudiantes_curso = []
             curso_suma_promedios = 0
             curso_estudiantes_aprobados = 0
             curso_total_estudiantes = 0
             
-            for matricula in matriculas:
-                # Obtener notas del estudiante en este curso
-                notas = db.query(Nota).filter(
-                    Nota.estudiante_id == matricula.estudiante_id,
-                    Nota.curso_id == curso.id
-                ).all()
+            for nota, estudiante in notas_por_curso[curso.id]:
+                # Calcular promedio ponderado del estudiante con pesos correctos
+                # PESOS CORRECTOS: Evaluaciones 10%, Prácticas 30%, Parciales 60%
+                peso_evaluaciones = 0.1
+                peso_practicas = 0.3
+                peso_parciales = 0.6
                 
-                if notas:
-                    estudiante = matricula.estudiante
-                    
-                    # Calcular promedio ponderado del estudiante con pesos correctos
-                    # PESOS CORRECTOS: Evaluaciones 10%, Prácticas 30%, Parciales 60%
-                    peso_evaluaciones = 0.1
-                    peso_practicas = 0.3
-                    peso_parciales = 0.6
-                    
-                    promedio_evaluaciones = 0
-                    promedio_practicas = 0
-                    promedio_parciales = 0
-                    
-                    suma_pesos = 0
-                    tiene_evaluaciones = False
-                    tiene_practicas = False
-                    tiene_parciales = False
-                    
-                    # Tomar la primera (y debería ser única) nota del estudiante para este curso
-                    nota = notas[0]
-                    
-                    # Calcular promedio de evaluaciones (1-8)
-                    evaluaciones = []
-                    for i in range(1, 9):
-                        eval_val = getattr(nota, f'evaluacion{i}')
-                        if eval_val is not None and float(eval_val) > 0:
-                            evaluaciones.append(float(eval_val))
-                    
-                    if evaluaciones:
-                        promedio_evaluaciones = sum(evaluaciones) / len(evaluaciones)
-                        suma_pesos += peso_evaluaciones
-                        tiene_evaluaciones = True
-                    
-                    # Calcular promedio de prácticas (1-4)
-                    practicas = []
-                    for i in range(1, 5):
-                        prac_val = getattr(nota, f'practica{i}')
-                        if prac_val is not None and float(prac_val) > 0:
-                            practicas.append(float(prac_val))
-                    
-                    if practicas:
-                        promedio_practicas = sum(practicas) / len(practicas)
-                        suma_pesos += peso_practicas
-                        tiene_practicas = True
-                    
-                    # Calcular promedio de parciales (1-2)
-                    parciales = []
-                    for i in range(1, 3):
-                        parc_val = getattr(nota, f'parcial{i}')
-                        if parc_val is not None and float(parc_val) > 0:
-                            parciales.append(float(parc_val))
-                    
-                    if parciales:
-                        promedio_parciales = sum(parciales) / len(parciales)
-                        suma_pesos += peso_parciales
-                        tiene_parciales = True
-                    
-                    # Calcular promedio ponderado final
-                    if suma_pesos > 0:
-                        promedio_final = (
-                            promedio_evaluaciones * peso_evaluaciones +
-                            promedio_practicas * peso_practicas +
-                            promedio_parciales * peso_parciales
-                        ) / suma_pesos
-                    else:
-                        promedio_final = 0
-                    
-                    estado = "Aprobado" if promedio_final >= 13.0 else "Reprobado"
-                    
-                    estudiante_data = {
-                        "id": estudiante.id,
-                        "nombre": f"{estudiante.first_name} {estudiante.last_name}",
-                        "dni": estudiante.dni,
-                        "email": estudiante.email,
-                        "promedio_final": round(promedio_final, 2),
-                        "estado": estado
-                    }
-                    
-                    estudiantes_curso.append(estudiante_data)
-                    curso_suma_promedios += promedio_final
-                    curso_total_estudiantes += 1
-                    
-                    if estado == "Aprobado":
-                        curso_estudiantes_aprobados += 1
-            
+                promedio_evaluaciones = 0
+                promedio_practicas = 0
+                promedio_parciales = 0
+                
+                suma_pesos = 0
+                tiene_evaluaciones = False
+                tiene_practicas = False
+                tiene_parciales = False
+                
+                # Calcular promedio de evaluaciones (1-8)
+                evaluaciones = _notas_registradas(nota, CAMPOS_EVALUACIONES)
+                
+                if evaluaciones:
+                    promedio_evaluaciones = sum(evaluaciones) / len(evaluaciones)
+                    suma_pesos += peso_evaluaciones
+                    tiene_evaluaciones = True
+                
+                # Calcular promedio de prácticas (1-4)
+                practicas = _notas_registradas(nota, CAMPOS_PRACTICAS)
+                
+                if practicas:
+                    promedio_practicas = sum(practicas) / len(practicas)
+                    suma_pesos += peso_practicas
+                    tiene_practicas = True
+                
+                # Calcular promedio de parciales (1-2)
+                parciales = _notas_registradas(nota, CAMPOS_PARCIALES)
+                
+                if parciales:
+                    promedio_parciales = sum(parciales) / len(parciales)
+                    suma_pesos += peso_parciales
+                    tiene_parciales = True
+                
+                # Calcular promedio ponderado final
+                if suma_pesos > 0:
+                    promedio_final = (
+                        promedio_evaluaciones * peso_evaluaciones +
+                        promedio_practicas * peso_practicas +
+                        promedio_parciales * peso_parciales
+                    ) / suma_pesos
+                else:
+                    promedio_final = 0
+                
+                estado = "Aprobado" if promedio_final >= 13.0 else "Reprobado"
+                
+                estudiante_data = {
+                    "id": estudiante.id,
+                    "nombre": estudiante.full_name,
+                    "dni": estudiante.dni,
+                    "email": estudiante.email,
+                    "promedio_final": round(promedio_final, 2),
+                    "estado": estado
+                }
+                
+                estudiantes_curso.append(estudiante_data)
+                curso_suma_promedios += promedio_final
+                curso_total_estudiantes += 1
+                
+                if estado == "Aprobado":
+                    curso_estudiantes_aprobados += 1
+        
             # Calcular estadísticas del curso
             promedio_curso = curso_suma_promedios / curso_total_estudiantes if curso_total_estudiantes > 0 else 0
             tasa_aprobacion = (curso_estudiantes_aprobados / curso_total_estudiantes * 100) if curso_total_estudiantes > 0 else 0
@@ -307,7 +309,8 @@ def get_failed_students_by_course(
         
         # Obtener estudiantes matriculados en el ciclo del curso
         matriculas = db.query(Matricula).options(
-            joinedload(Matricula.estudiante)
+            joinedload(Matricula.estudiante),
+            raiseload('*')
         ).filter(
             Matricula.ciclo_id == curso.ciclo_id,
             Matricula.is_active == True
@@ -340,33 +343,21 @@ def get_failed_students_by_course(
                 nota = notas[0]
                 
                 # Calcular promedio de evaluaciones (1-8)
-                evaluaciones = []
-                for i in range(1, 9):
-                    eval_val = getattr(nota, f'evaluacion{i}')
-                    if eval_val is not None and float(eval_val) > 0:
-                        evaluaciones.append(float(eval_val))
+                evaluaciones = _notas_registradas(nota, CAMPOS_EVALUACIONES)
                 
                 if evaluaciones:
                     promedio_evaluaciones = sum(evaluaciones) / len(evaluaciones)
                     suma_pesos += peso_evaluaciones
                 
                 # Calcular promedio de prácticas (1-4)
-                practicas = []
-                for i in range(1, 5):
-                    prac_val = getattr(nota, f'practica{i}')
-                    if prac_val is not None and float(prac_val) > 0:
-                        practicas.append(float(prac_val))
+                practicas = _notas_registradas(nota, CAMPOS_PRACTICAS)
                 
                 if practicas:
                     promedio_practicas = sum(practicas) / len(practicas)
                     suma_pesos += peso_practicas
                 
                 # Calcular promedio de parciales (1-2)
-                parciales = []
-                for i in range(1, 3):
-                    parc_val = getattr(nota, f'parcial{i}')
-                    if parc_val is not None and float(parc_val) > 0:
-                        parciales.append(float(parc_val))
+                parciales = _notas_registradas(nota, CAMPOS_PARCIALES)
                 
                 if parciales:
                     promedio_parciales = sum(parciales) / len(parciales)
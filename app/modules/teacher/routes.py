@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager, load_only, raiseload
 from sqlalchemy import func, and_, or_
 from datetime import datetime, timedelta, timezone
+from collections import defaultdict
 
 from ...database import get_db
 from ..auth.dependencies import get_docente_user
 from ..auth.models import User
 from .models import Curso, Matricula, Nota, HistorialNota, Ciclo
-from .schemas import DocenteDashboard
+from .schemas import DocenteDashboard, DocenteDashboardResumen
+from ...shared.grade_calculator import (
+    CAMPOS_NOTA, CAMPOS_EVALUACIONES, CAMPOS_PRACTICAS, CAMPOS_PARCIALES, valores_nota,
+)
+from ...shared.cache import DASHBOARD_DOCENTE, cache_por_usuario
+from ...config import settings
 
 # Importar routers de otros módulos
 from .cursos_routes import router as cursos_router
@@ -15,7 +22,8 @@ from .calificaciones_routes import router as calificaciones_router
 from .perfil_routes import router as perfil_router
 from .reporte_routes import router as reporte_router
 
-router = APIRouter(prefix="/teacher", tags=["Docente"])
+# ORJSONResponse también aplica a los sub-routers incluidos más abajo (cursos, calificaciones, ...)
+router = APIRouter(prefix="/teacher", tags=["Docente"], default_response_class=ORJSONResponse)
 
 
 # Incluir routers de otros módulos
@@ -24,26 +32,89 @@ router.include_router(calificaciones_router, tags=["Calificaciones"])
 router.include_router(perfil_router, tags=["Perfil"])
 router.include_router(reporte_router, tags=["Reportes"])
 
-@router.get("/dashboard", response_model=DocenteDashboard)
-def get_teacher_dashboard(
-    current_user: User = Depends(get_docente_user),
-    db: Session = Depends(get_db)
-):
-    """Obtener dashboard completo del docente con estadísticas avanzadas"""
-    
+def _cursos_actuales_docente(db: Session, docente_id: int):
+    """Cursos activos del docente en ciclos vigentes, con su ciclo (nombre y año)"""
     # Obtener fecha actual para filtrar ciclos activos
     fecha_actual = datetime.now(timezone.utc).date()
     
-    # Obtener cursos del docente que pertenecen a ciclos activos
-    cursos = db.query(Curso).join(Ciclo).filter(
-        Curso.docente_id == current_user.id,
+    return db.query(Curso).join(Ciclo).filter(
+        Curso.docente_id == docente_id,
         Curso.is_active == True,
         Ciclo.is_active == True,
         Ciclo.fecha_inicio <= fecha_actual,
         Ciclo.fecha_fin >= fecha_actual
     ).options(
-        joinedload(Curso.ciclo)
+        # Solo las columnas que se devuelven en la respuesta
+        load_only(Curso.id, Curso.nombre, Curso.ciclo_id, Curso.docente_id, Curso.is_active, Curso.created_at),
+        # El JOIN con Ciclo ya está en la consulta (filtros), se reutiliza para cargar curso.ciclo
+        contains_eager(Curso.ciclo).load_only(Ciclo.nombre, Ciclo.año),
+        raiseload('*')
     ).all()
+
+def _datos_curso(curso: Curso) -> dict:
+    """Datos del curso comunes al dashboard y a su resumen"""
+    return {
+        "id": curso.id,
+        "nombre": curso.nombre,
+        "ciclo_id": curso.ciclo_id,
+        "docente_id": curso.docente_id,
+        "is_active": curso.is_active,
+        "created_at": curso.created_at,
+        "ciclo_nombre": curso.ciclo.nombre if curso.ciclo else "Sin ciclo",
+        "ciclo_año": curso.ciclo.año if curso.ciclo else None
+    }
+
+def _docente_info(docente: User) -> dict:
+    """Datos del docente mostrados en la cabecera del dashboard"""
+    return {
+        "id": docente.id,
+        "nombre_completo": docente.full_name,
+        "email": docente.email,
+        "especialidad": docente.especialidad or "No especificada",
+        "grado_academico": docente.grado_academico or "No especificado"
+    }
+
+# Etiqueta de cada categoría en la actividad reciente
+_ETIQUETAS_CATEGORIA = (
+    ("Evaluación", CAMPOS_EVALUACIONES),
+    ("Práctica", CAMPOS_PRACTICAS),
+    ("Parcial", CAMPOS_PARCIALES),
+)
+
+def _contar_registradas(nota, campos) -> int:
+    """Cantidad de calificaciones registradas (mayores a 0) de una categoría"""
+    return sum(1 for valor in valores_nota(nota, campos).values() if valor is not None and valor > 0)
+
+@router.get("/dashboard", response_model=DocenteDashboard)
+@cache_por_usuario(expire=settings.dashboard_cache_ttl, namespace=DASHBOARD_DOCENTE)
+def get_teacher_dashboard(
+    current_user: User = Depends(get_docente_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener dashboard completo del docente con estadísticas avanzadas"""
+    
+    # Obtener cursos del docente que pertenecen a ciclos activos
+    cursos = _cursos_actuales_docente(db, current_user.id)
+    
+    # Matrículas activas y notas de todos los cursos en dos consultas (en lugar de dos por curso)
+    ciclo_ids = {curso.ciclo_id for curso in cursos}
+    curso_ids = [curso.id for curso in cursos]
+    
+    estudiantes_por_ciclo = defaultdict(list)
+    notas_por_curso = defaultdict(list)
+    if cursos:
+        for ciclo_id, estudiante_id in db.query(Matricula.ciclo_id, Matricula.estudiante_id).filter(
+            Matricula.ciclo_id.in_(ciclo_ids),
+            Matricula.estado == "activa"
+        ):
+            estudiantes_por_ciclo[ciclo_id].append(estudiante_id)
+        
+        # Solo las columnas de calificación que usa GradeCalculator (sin observaciones ni fechas)
+        for nota in db.query(Nota).filter(Nota.curso_id.in_(curso_ids)).options(
+            load_only(Nota.estudiante_id, Nota.curso_id, *(getattr(Nota, campo) for campo in CAMPOS_NOTA)),
+            raiseload('*')
+        ):
+            notas_por_curso[nota.curso_id].append(nota)
     
     # Convertir cursos a formato de respuesta
     cursos_response = []
@@ -54,53 +125,46 @@ def get_teacher_dashboard(
     estudiantes_desaprobados_total = 0
     
     for curso in cursos:
-        # Contar estudiantes matriculados en el ciclo del curso
-        matriculas = db.query(Matricula).filter(
-            Matricula.ciclo_id == curso.ciclo_id,
-            Matricula.estado == "activa"
-        ).all()
+        # Estudiantes matriculados en el ciclo del curso
+        estudiantes_ciclo = estudiantes_por_ciclo[curso.ciclo_id]
         
-        estudiantes_count = len(matriculas)
+        estudiantes_count = len(estudiantes_ciclo)
         total_estudiantes += estudiantes_count
         
-        # Calcular estadísticas de notas para este curso
-        notas_curso = db.query(Nota).filter(
-            Nota.curso_id == curso.id
-        ).all()
+        # Notas de este curso (ya cargadas)
+        notas_curso = notas_por_curso[curso.id]
+        # Índice por estudiante (un registro de nota por estudiante y curso)
+        notas_por_estudiante = {n.estudiante_id: n for n in notas_curso}
         
-        # Contar notas pendientes (estudiantes sin promedio final)
+        # Una sola pasada por estudiante: promedio calculado una vez, luego pendientes,
+        # aprobados/desaprobados y promedio del curso
         estudiantes_con_notas = 0
-        for matricula in matriculas:
-            nota_estudiante = next((n for n in notas_curso if n.estudiante_id == matricula.estudiante_id), None)
-            if nota_estudiante and nota_estudiante.calcular_promedio_final() > 0:
+        promedio_curso = 0
+        aprobados_curso = 0
+        desaprobados_curso = 0
+        promedios_estudiantes = []
+        
+        for estudiante_id in estudiantes_ciclo:
+            nota_estudiante = notas_por_estudiante.get(estudiante_id)
+            if not nota_estudiante:
+                continue
+            promedio_final = nota_estudiante.calcular_promedio_final()
+            if promedio_final > 0:
                 estudiantes_con_notas += 1
+                promedios_estudiantes.append(promedio_final)
+                
+                # Verificar aprobación (nota >= 13.0)
+                if promedio_final >= 13.0:
+                    aprobados_curso += 1
+                else:
+                    desaprobados_curso += 1
         
         notas_pendientes = estudiantes_count - estudiantes_con_notas
         total_notas_pendientes += notas_pendientes
         
-        # Calcular promedio del curso y estudiantes aprobados/desaprobados
-        promedio_curso = 0
-        aprobados_curso = 0
-        desaprobados_curso = 0
-        
-        if notas_curso:
-            # Calcular promedio ponderado por estudiante
-            promedios_estudiantes = []
-            for matricula in matriculas:
-                nota_estudiante = next((n for n in notas_curso if n.estudiante_id == matricula.estudiante_id), None)
-                if nota_estudiante and nota_estudiante.calcular_promedio_final() > 0:
-                    promedio_final = nota_estudiante.calcular_promedio_final()
-                    promedios_estudiantes.append(promedio_final)
-                    
-                    # Verificar aprobación (nota >= 13.0)
-                    if promedio_final >= 13.0:
-                        aprobados_curso += 1
-                    else:
-                        desaprobados_curso += 1
-            
-            if promedios_estudiantes:
-                promedio_curso = sum(promedios_estudiantes) / len(promedios_estudiantes)
-                promedio_general_acumulado += promedio_curso
+        if promedios_estudiantes:
+            promedio_curso = sum(promedios_estudiantes) / len(promedios_estudiantes)
+            promedio_general_acumulado += promedio_curso
         
         estudiantes_aprobados_total += aprobados_curso
         estudiantes_desaprobados_total += desaprobados_curso
@@ -113,32 +177,22 @@ def get_teacher_dashboard(
         
         for nota in notas_curso:
             # Contar evaluaciones (1-8)
-            evaluaciones_count = sum(1 for i in range(1, 9) 
-                                   if getattr(nota, f'evaluacion{i}') is not None and getattr(nota, f'evaluacion{i}') > 0)
+            evaluaciones_count = _contar_registradas(nota, CAMPOS_EVALUACIONES)
             total_evaluaciones += evaluaciones_count
             
             # Contar prácticas (1-4)
-            practicas_count = sum(1 for i in range(1, 5) 
-                                if getattr(nota, f'practica{i}') is not None and getattr(nota, f'practica{i}') > 0)
+            practicas_count = _contar_registradas(nota, CAMPOS_PRACTICAS)
             total_practicas += practicas_count
             
             # Contar parciales (1-2)
-            parciales_count = sum(1 for i in range(1, 3) 
-                                if getattr(nota, f'parcial{i}') is not None and getattr(nota, f'parcial{i}') > 0)
+            parciales_count = _contar_registradas(nota, CAMPOS_PARCIALES)
             total_parciales += parciales_count
             
             # Total de notas registradas para este estudiante
             total_notas_registradas += evaluaciones_count + practicas_count + parciales_count
         
         curso_data = {
-            "id": curso.id,
-            "nombre": curso.nombre,
-            "ciclo_id": curso.ciclo_id,
-            "docente_id": curso.docente_id,
-            "is_active": curso.is_active,
-            "created_at": curso.created_at,
-            "ciclo_nombre": curso.ciclo.nombre if curso.ciclo else "Sin ciclo",
-            "ciclo_año": curso.ciclo.año if curso.ciclo else None,
+            **_datos_curso(curso),
             "total_estudiantes": estudiantes_count,
             "promedio_curso": round(promedio_curso, 2) if promedio_curso > 0 else None,
             "estudiantes_aprobados": aprobados_curso,
@@ -161,13 +215,21 @@ def get_teacher_dashboard(
     # Calcular promedio de estudiantes por curso
     promedio_estudiantes = total_estudiantes / total_cursos if total_cursos > 0 else 0
     
-    # Obtener ciclos únicos
-    ciclos_unicos = list(set([curso.ciclo_id for curso in cursos]))
-    total_ciclos = len(ciclos_unicos)
+    # Ciclos únicos (ya reunidos para la consulta de matrículas)
+    total_ciclos = len(ciclo_ids)
     
     # Actividad reciente - últimas 10 notas registradas de todos los cursos del docente
     actividad_reciente = []
-    notas_recientes = db.query(Nota, User, Curso).select_from(Nota).join(
+    # Solo las columnas que se muestran: calificaciones y fechas de la nota, y los nombres del
+    # estudiante y del curso del mismo JOIN (sin cargar entidades Nota, User ni Curso)
+    notas_recientes = db.query(
+        Nota.id,
+        Nota.created_at,
+        Nota.updated_at,
+        *(getattr(Nota, campo) for campo in CAMPOS_NOTA),
+        User.full_name.label("estudiante_nombre"),
+        Curso.nombre.label("curso_nombre")
+    ).select_from(Nota).join(
         User, Nota.estudiante_id == User.id
     ).join(
         Curso, Nota.curso_id == Curso.id
@@ -175,27 +237,17 @@ def get_teacher_dashboard(
         Curso.docente_id == current_user.id
     ).order_by(Nota.created_at.desc()).limit(10).all()
     
-    for nota, estudiante, curso in notas_recientes:
+    # Misma referencia de tiempo para todas las actividades
+    ahora = datetime.now(timezone.utc)
+    for nota in notas_recientes:
         # Obtener las notas individuales que tienen valor
         notas_registradas = []
         
-        # Evaluaciones (1-8)
-        for i in range(1, 9):
-            eval_val = getattr(nota, f'evaluacion{i}')
-            if eval_val is not None and float(eval_val) > 0:
-                notas_registradas.append(f"Evaluación {i}: {eval_val}")
-        
-        # Prácticas (1-4)
-        for i in range(1, 5):
-            prac_val = getattr(nota, f'practica{i}')
-            if prac_val is not None and float(prac_val) > 0:
-                notas_registradas.append(f"Práctica {i}: {prac_val}")
-        
-        # Parciales (1-2)
-        for i in range(1, 3):
-            parc_val = getattr(nota, f'parcial{i}')
-            if parc_val is not None and float(parc_val) > 0:
-                notas_registradas.append(f"Parcial {i}: {parc_val}")
+        # Evaluaciones (1-8), prácticas (1-4) y parciales (1-2), en ese orden
+        for etiqueta, campos in _ETIQUETAS_CATEGORIA:
+            for i, valor in enumerate(valores_nota(nota, campos).values(), start=1):
+                if valor is not None and valor > 0:
+                    notas_registradas.append(f"{etiqueta} {i}: {valor:.2f}")
         
         # Determinar la fecha más relevante (updated_at si existe, sino created_at)
         fecha_relevante = nota.updated_at if nota.updated_at else nota.created_at
@@ -207,38 +259,23 @@ def get_teacher_dashboard(
             descripcion_notas = ", ".join(notas_mostrar)
             if len(notas_registradas) > 3:
                 descripcion_notas += f" (+{len(notas_registradas) - 3} más)"
-            descripcion = f"{estudiante.first_name} {estudiante.last_name} - {descripcion_notas}"
+            descripcion = f"{nota.estudiante_nombre} - {descripcion_notas}"
         else:
-            descripcion = f"{estudiante.first_name} {estudiante.last_name} - Sin notas registradas"
+            descripcion = f"{nota.estudiante_nombre} - Sin notas registradas"
         
         actividad_reciente.append({
             "id": nota.id,
-            "accion": f"Registro de notas - {curso.nombre}",
+            "accion": f"Registro de notas - {nota.curso_nombre}",
             "descripcion": descripcion,
             "fecha": fecha_relevante.strftime("%Y-%m-%d %H:%M"),
-            "tiempo_relativo": calcular_tiempo_relativo(fecha_relevante)
+            "tiempo_relativo": calcular_tiempo_relativo(fecha_relevante, ahora)
         })
     
-    # Si no hay historial reciente, agregar actividades simuladas
-    if not actividad_reciente:
-        actividad_reciente = [
-            {
-                "id": 1,
-                "accion": "Dashboard actualizado",
-                "descripcion": "Estadísticas recalculadas automáticamente",
-                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "tiempo_relativo": "Hace unos momentos"
-            }
-        ]
+    # Sin historial reciente la lista va vacía: una actividad simulada con la hora actual
+    # quedaría congelada en la caché durante todo el TTL
     
     return {
-        "docente_info": {
-            "id": current_user.id,
-            "nombre_completo": f"{current_user.first_name} {current_user.last_name}",
-            "email": current_user.email,
-            "especialidad": current_user.especialidad or "No especificada",
-            "grado_academico": current_user.grado_academico or "No especificado"
-        },
+        "docente_info": _docente_info(current_user),
         "estadisticas_generales": {
             "total_cursos": total_cursos,
             "total_estudiantes": total_estudiantes,
@@ -254,10 +291,23 @@ def get_teacher_dashboard(
         "actividad_reciente": actividad_reciente
     }
 
-def calcular_tiempo_relativo(fecha):
-    """Calcular tiempo relativo desde una fecha"""
+@router.get("/dashboard/skeleton", response_model=DocenteDashboardResumen)
+def get_teacher_dashboard_skeleton(
+    current_user: User = Depends(get_docente_user),
+    db: Session = Depends(get_db)
+):
+    """Datos del docente y sus cursos actuales (una consulta) para pintar el dashboard
+    mientras /dashboard calcula las estadísticas"""
+    return {
+        "docente_info": _docente_info(current_user),
+        "cursos_actuales": [_datos_curso(curso) for curso in _cursos_actuales_docente(db, current_user.id)]
+    }
+
+def calcular_tiempo_relativo(fecha, ahora=None):
+    """Calcular tiempo relativo desde una fecha (ahora se puede pasar para reutilizarlo en un listado)"""
     # Usar datetime con timezone UTC para comparar con fechas timezone-aware
-    ahora = datetime.now(timezone.utc)
+    if ahora is None:
+        ahora = datetime.now(timezone.utc)
     
     # Si la fecha no tiene timezone, asumimos que es UTC
     if fecha.tzinfo is None:
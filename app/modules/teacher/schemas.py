@@ -316,16 +316,55 @@ class EstadisticasCursoDetalladas(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class DocenteInfo(BaseModel):
+    """Datos del docente en la cabecera del dashboard"""
+    id: int
+    nombre_completo: str
+    email: str
+    especialidad: str
+    grado_academico: str
+
+class CursoActualDocente(BaseModel):
+    """Curso del docente en un ciclo vigente"""
+    id: int
+    nombre: str
+    ciclo_id: int
+    docente_id: int
+    is_active: bool
+    created_at: datetime
+    ciclo_nombre: str
+    ciclo_año: Optional[int] = None
+
+class CursoDashboardDocente(CursoActualDocente):
+    """Curso actual con sus estadísticas de matrícula y notas"""
+    total_estudiantes: int
+    promedio_curso: Optional[float] = None
+    estudiantes_aprobados: int
+    estudiantes_desaprobados: int
+    notas_pendientes: int
+    total_notas_registradas: int
+    total_evaluaciones: int
+    total_practicas: int
+    total_parciales: int
+    max_evaluaciones: int
+    max_practicas: int
+    max_parciales: int
+
 class DocenteDashboard(BaseModel):
     """Dashboard completo del docente con estadísticas avanzadas"""
-    docente_info: dict
+    docente_info: DocenteInfo
     estadisticas_generales: dict
-    cursos_actuales: List[dict]
+    cursos_actuales: List[CursoDashboardDocente]
     actividad_reciente: List[dict]
     
     class Config:
         from_attributes = True
 
+class DocenteDashboardResumen(BaseModel):
+    """Datos básicos del dashboard del docente (sin estadísticas) para la carga inicial"""
+    docente_info: DocenteInfo
+    cursos_actuales: List[CursoActualDocente]
+
 class EstadisticasDocente(BaseModel):
     """Estadísticas del docente"""
     total_cursos: int
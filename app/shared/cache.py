@@ -0,0 +1,153 @@
+"""
+Caché de respuestas con fastapi-cache2 sobre Redis
+"""
+import logging
+from functools import wraps
+from typing import Iterable, List
+
+from anyio import from_thread
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.decorator import cache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prefijo común de todas las claves en Redis
+CACHE_PREFIX = "sistema-notas"
+
+# Namespaces de caché
+DASHBOARD_ESTUDIANTE = "dashboard-estudiante"
+ESTADISTICAS_ESTUDIANTE = "estadisticas-estudiante"
+DASHBOARD_DOCENTE = "dashboard-docente"
+CURSOS_DOCENTE = "cursos-docente"
+
+# Respuestas cacheadas por estudiante que dependen de sus notas y matrículas
+_NAMESPACES_ESTUDIANTE = (DASHBOARD_ESTUDIANTE, ESTADISTICAS_ESTUDIANTE)
+
+# Respuestas cacheadas por docente que dependen de sus cursos, matrículas y notas
+_NAMESPACES_DOCENTE = (DASHBOARD_DOCENTE, CURSOS_DOCENTE)
+
+
+class _BackendSinCache(Backend):
+    """Backend que no guarda nada: los endpoints con @cache siempre ejecutan la consulta"""
+
+    async def get_with_ttl(self, key):
+        return 0, None
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, expire=None):
+        return None
+
+    async def clear(self, namespace=None, key=None):
+        return 0
+
+
+def init_cache():
+    """
+    Inicializa fastapi-cache2 con Redis (se llama desde el lifespan de la aplicación).
+    Si Redis no se puede configurar la aplicación arranca sin caché en lugar de fallar;
+    los errores de Redis en cada petición los registra @cache y la respuesta se calcula igual.
+    """
+    try:
+        redis = aioredis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password or None,
+            # Con Redis caído o inalcanzable cada operación falla rápido en vez de bloquear la petición
+            socket_connect_timeout=settings.redis_timeout,
+            socket_timeout=settings.redis_timeout
+        )
+        FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX, expire=settings.redis_cache_ttl)
+    except Exception:
+        logger.warning("No se pudo inicializar la caché en Redis, se continúa sin caché", exc_info=True)
+        FastAPICache.init(_BackendSinCache(), prefix=CACHE_PREFIX, expire=settings.redis_cache_ttl)
+
+
+def clave_por_usuario(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    """
+    Key builder de @cache: una entrada por usuario autenticado y filtros de la petición
+    (<prefijo>:<namespace>:<user_id>:<query string ordenado>)
+    """
+    consulta = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items())) if request else ""
+    return f"{namespace}:{kwargs['current_user'].id}:{consulta}"
+
+
+def cache_por_usuario(expire: int, namespace: str):
+    """
+    @cache con una entrada por usuario (clave_por_usuario) y Cache-Control privado.
+    fastapi-cache responde con "max-age=<ttl>", que permitiría a navegadores y proxies compartidos
+    seguir sirviendo la respuesta tras invalidarla en el servidor; con "private, no-cache" solo el
+    navegador del usuario la guarda y la revalida siempre con el ETag (304 si no cambió).
+    """
+    def decorador(func):
+        cacheada = cache(expire=expire, namespace=namespace, key_builder=clave_por_usuario)(func)
+
+        @wraps(cacheada)
+        async def con_cache_privada(*args, **kwargs):
+            resultado = await cacheada(*args, **kwargs)
+            # Response que @cache inyecta en el endpoint y en la que escribe sus cabeceras
+            response = kwargs.get("__fastapi_cache_response")
+            if response is not None:
+                response.headers["Cache-Control"] = "private, no-cache"
+            return resultado
+
+        return con_cache_privada
+    return decorador
+
+
+async def _borrar_namespaces(namespaces: Iterable[str]):
+    backend = FastAPICache.get_backend()
+    for namespace in namespaces:
+        await backend.clear(namespace=namespace)
+
+
+def _borrar_claves(por_borrar: List[str]):
+    """
+    Borra las entradas de caché bajo cada prefijo de clave.
+    Pensado para los endpoints síncronos (threadpool): ejecuta el borrado en el event loop.
+    Si la caché no está disponible solo se registra el error, la respuesta expira por TTL.
+    """
+    try:
+        from_thread.run(_borrar_namespaces, por_borrar)
+    except AssertionError:
+        # FastAPICache sin inicializar (p. ej. scripts fuera de la aplicación)
+        return
+    except Exception:
+        logger.warning("No se pudo invalidar la caché %s", por_borrar, exc_info=True)
+
+
+def invalidar_cache_usuarios(namespaces: Iterable[str], *user_ids: int):
+    """Borra las entradas de caché de los usuarios indicados (con cualquier filtro) en los namespaces"""
+    if not user_ids:
+        return
+    _borrar_claves([
+        f"{CACHE_PREFIX}:{namespace}:{user_id}"
+        for namespace in namespaces
+        for user_id in set(user_ids)
+    ])
+
+
+def invalidar_cache_estudiante(*estudiante_ids: int):
+    """Invalida el dashboard y las estadísticas cacheadas de los estudiantes (tras modificar sus notas o matrículas)"""
+    invalidar_cache_usuarios(_NAMESPACES_ESTUDIANTE, *estudiante_ids)
+
+
+def invalidar_cache_docente(*docente_ids: int):
+    """Invalida el dashboard y la lista de cursos cacheados de los docentes (tras modificar sus cursos, matrículas o notas)"""
+    invalidar_cache_usuarios(_NAMESPACES_DOCENTE, *(docente_id for docente_id in docente_ids if docente_id))
+
+
+def invalidar_cache_docentes():
+    """
+    Invalida el dashboard y la lista de cursos cacheados de todos los docentes.
+    Para cambios de matrícula: afectan a los docentes del ciclo, y borrar todo el namespace
+    evita consultar quiénes son (las entradas se regeneran en la siguiente petición).
+    """
+    _borrar_claves([f"{CACHE_PREFIX}:{namespace}" for namespace in _NAMESPACES_DOCENTE])
@@ -1,8 +1,39 @@
 from decimal import Decimal
-from typing import List, Dict, Optional
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.shared.models import Nota
 
+# Columnas de calificación de Nota por categoría
+CAMPOS_EVALUACIONES = tuple(f'evaluacion{i}' for i in range(1, 9))
+CAMPOS_PRACTICAS = tuple(f'practica{i}' for i in range(1, 5))
+CAMPOS_PARCIALES = tuple(f'parcial{i}' for i in range(1, 3))
+CAMPOS_NOTA = CAMPOS_EVALUACIONES + CAMPOS_PRACTICAS + CAMPOS_PARCIALES
+
+# Lectores de las columnas de calificación (devuelven una tupla por categoría)
+_EVALUACIONES = attrgetter(*CAMPOS_EVALUACIONES)
+_PRACTICAS = attrgetter(*CAMPOS_PRACTICAS)
+_PARCIALES = attrgetter(*CAMPOS_PARCIALES)
+_LECTORES = {
+    CAMPOS_EVALUACIONES: _EVALUACIONES,
+    CAMPOS_PRACTICAS: _PRACTICAS,
+    CAMPOS_PARCIALES: _PARCIALES,
+    CAMPOS_NOTA: attrgetter(*CAMPOS_NOTA),
+}
+
+
+def valores_nota(nota, campos=CAMPOS_NOTA) -> Dict[str, Optional[float]]:
+    """
+    {columna: valor} de las calificaciones de una nota (objeto Nota o fila de una consulta por
+    columnas). `campos` es CAMPOS_NOTA o una de las tuplas por categoría.
+    """
+    return dict(zip(campos, _LECTORES[campos](nota)))
+
+
+def get_grade_cache() -> Dict:
+    """Dependencia de FastAPI: caché de promedios que vive solo durante la petición"""
+    return {}
+
 
 class GradeCalculator:
     """Calculadora de calificaciones según el sistema específico del ciclo de 4 meses"""
@@ -14,35 +45,23 @@ class GradeCalculator:
     
     NOTA_MINIMA_APROBACION = Decimal('13.0')
     
+    # Los cursos no tienen créditos propios: cada curso aprobado vale lo mismo
+    CREDITOS_POR_CURSO = 3
+    
     @classmethod
     def calcular_promedio_evaluaciones(cls, nota: Nota) -> Optional[Decimal]:
         """Calcula el promedio de las evaluaciones semanales (1-8)"""
-        evaluaciones = []
-        for i in range(1, 9):
-            eval_val = getattr(nota, f'evaluacion{i}')
-            if eval_val is not None and float(eval_val) > 0:
-                evaluaciones.append(Decimal(str(eval_val)))
-        return cls._calcular_promedio_lista(evaluaciones)
+        return cls._calcular_promedio_lista(cls._notas_validas(_EVALUACIONES(nota)))
     
     @classmethod
     def calcular_promedio_practicas(cls, nota: Nota) -> Optional[Decimal]:
         """Calcula el promedio de las prácticas (1-4)"""
-        practicas = []
-        for i in range(1, 5):
-            prac_val = getattr(nota, f'practica{i}')
-            if prac_val is not None and float(prac_val) > 0:
-                practicas.append(Decimal(str(prac_val)))
-        return cls._calcular_promedio_lista(practicas)
+        return cls._calcular_promedio_lista(cls._notas_validas(_PRACTICAS(nota)))
     
     @classmethod
     def calcular_promedio_parciales(cls, nota: Nota) -> Optional[Decimal]:
         """Calcula el promedio de los parciales (1-2)"""
-        parciales = []
-        for i in range(1, 3):
-            parc_val = getattr(nota, f'parcial{i}')
-            if parc_val is not None and float(parc_val) > 0:
-                parciales.append(Decimal(str(parc_val)))
-        return cls._calcular_promedio_lista(parciales)
+        return cls._calcular_promedio_lista(cls._notas_validas(_PARCIALES(nota)))
 
     @classmethod
     def calcular_promedio_nota(cls, nota: Nota) -> Optional[Decimal]:
@@ -52,42 +71,58 @@ class GradeCalculator:
         - Prácticas 1-4: 30%  
         - Parciales 1-2: 60%
         """
-        # Calcular promedio de evaluaciones
-        evaluaciones = []
-        for i in range(1, 9):
-            eval_val = getattr(nota, f'evaluacion{i}')
-            if eval_val is not None and float(eval_val) > 0:
-                evaluaciones.append(Decimal(str(eval_val)))
-        
-        # Calcular promedio de prácticas
-        practicas = []
-        for i in range(1, 5):
-            prac_val = getattr(nota, f'practica{i}')
-            if prac_val is not None and float(prac_val) > 0:
-                practicas.append(Decimal(str(prac_val)))
-        
-        # Calcular promedio de parciales
-        parciales = []
-        for i in range(1, 3):
-            parc_val = getattr(nota, f'parcial{i}')
-            if parc_val is not None and float(parc_val) > 0:
-                parciales.append(Decimal(str(parc_val)))
+        return cls._calcular_nota(nota)[1]
+    
+    @classmethod
+    def calcular_detalle_nota(cls, nota: Optional[Nota]) -> Dict:
+        """Promedios por categoría de una nota (detalle del promedio final)"""
+        if nota is None:
+            return {
+                'promedio_evaluaciones': Decimal('0.00'),
+                'promedio_practicas': Decimal('0.00'),
+                'promedio_parciales': Decimal('0.00')
+            }
+        return {
+            'promedio_evaluaciones': cls.calcular_promedio_evaluaciones(nota),
+            'promedio_practicas': cls.calcular_promedio_practicas(nota),
+            'promedio_parciales': cls.calcular_promedio_parciales(nota)
+        }
+    
+    @classmethod
+    def calcular_promedio_nota_cacheado(cls, nota: Nota, cache: Dict) -> Optional[Decimal]:
+        """calcular_promedio_nota memoizado por (estudiante_id, curso_id) en la caché de la petición"""
+        return cls._calcular_nota(nota, cache)[1]
+    
+    @classmethod
+    def _calcular_nota(cls, nota: Nota, cache: Optional[Dict] = None) -> Tuple[Dict, Optional[Decimal]]:
+        """
+        (detalle por categoría, promedio final) de una nota: el único cálculo del promedio,
+        a partir de calcular_detalle_nota. Con `cache` se memoiza por (estudiante_id, curso_id).
+        """
+        if cache is not None:
+            clave = (nota.estudiante_id, nota.curso_id)
+            if clave in cache:
+                return cache[clave]
         
-        # Calcular promedios por categoría
-        prom_evaluaciones = cls._calcular_promedio_lista(evaluaciones)
-        prom_practicas = cls._calcular_promedio_lista(practicas)
-        prom_parciales = cls._calcular_promedio_lista(parciales)
+        detalle = cls.calcular_detalle_nota(nota)
+        prom_evaluaciones = detalle['promedio_evaluaciones']
+        prom_practicas = detalle['promedio_practicas']
+        prom_parciales = detalle['promedio_parciales']
         
         # Solo calcular promedio final si hay al menos una nota en cada categoría
+        promedio_final = None
         if prom_evaluaciones > 0 and prom_practicas > 0 and prom_parciales > 0:
-            promedio_final = (
+            promedio_final = round(
                 prom_evaluaciones * cls.PESO_EVALUACIONES +
                 prom_practicas * cls.PESO_PRACTICAS +
-                prom_parciales * cls.PESO_PARCIALES
+                prom_parciales * cls.PESO_PARCIALES,
+                2
             )
-            return round(promedio_final, 2)
         
-        return None
+        resultado = (detalle, promedio_final)
+        if cache is not None:
+            cache[clave] = resultado
+        return resultado
     
     @classmethod
     def calcular_promedio_final(cls, estudiante_id: int, curso_id: int, db: Session) -> Dict:
@@ -120,23 +155,9 @@ class GradeCalculator:
         todos_parciales = []
         
         for nota in notas:
-            # Evaluaciones semanales (evaluacion1-8)
-            for i in range(1, 9):
-                eval_field = getattr(nota, f'evaluacion{i}', None)
-                if eval_field is not None and float(eval_field) > 0:
-                    todas_evaluaciones.append(Decimal(str(eval_field)))
-            
-            # Prácticas (practica1-4)
-            for i in range(1, 5):
-                prac_field = getattr(nota, f'practica{i}', None)
-                if prac_field is not None and float(prac_field) > 0:
-                    todas_practicas.append(Decimal(str(prac_field)))
-            
-            # Parciales (parcial1-2)
-            for i in range(1, 3):
-                parc_field = getattr(nota, f'parcial{i}', None)
-                if parc_field is not None and float(parc_field) > 0:
-                    todos_parciales.append(Decimal(str(parc_field)))
+            todas_evaluaciones.extend(cls._notas_validas(_EVALUACIONES(nota)))
+            todas_practicas.extend(cls._notas_validas(_PRACTICAS(nota)))
+            todos_parciales.extend(cls._notas_validas(_PARCIALES(nota)))
         
         # Calcular promedios por tipo
         promedio_evaluaciones = cls._calcular_promedio_lista(todas_evaluaciones)
@@ -174,6 +195,47 @@ class GradeCalculator:
             }
         }
     
+    @classmethod
+    def calcular_promedios_por_cursos(cls, estudiante_id: int, curso_ids: List[int], db: Session,
+                                      notas: Optional[List[Nota]] = None,
+                                      cache: Optional[Dict] = None) -> Dict[int, Dict]:
+        """
+        Calcula el promedio final, estado y detalle de un estudiante en varios cursos a la vez.
+        Si se pasan las notas ya cargadas no se consulta la base de datos; con `cache`
+        se reutilizan los promedios ya calculados en la misma petición.
+        Devuelve {curso_id: {'promedio_final': Decimal | None, 'estado': str, 'detalle': dict}}
+        """
+        if notas is None:
+            notas = db.query(Nota).filter(
+                Nota.estudiante_id == estudiante_id,
+                Nota.curso_id.in_(curso_ids)
+            ).all() if curso_ids else []
+        
+        notas_por_curso = {nota.curso_id: nota for nota in notas}
+        resultado = {}
+        
+        for curso_id in curso_ids:
+            nota = notas_por_curso.get(curso_id)
+            if nota is None:
+                detalle, promedio_final = cls.calcular_detalle_nota(None), None
+            else:
+                detalle, promedio_final = cls._calcular_nota(nota, cache)
+            
+            if promedio_final is None:
+                estado = "PENDIENTE"
+            elif promedio_final >= cls.NOTA_MINIMA_APROBACION:
+                estado = "APROBADO"
+            else:
+                estado = "DESAPROBADO"
+            
+            resultado[curso_id] = {
+                'promedio_final': promedio_final,
+                'estado': estado,
+                'detalle': detalle
+            }
+        
+        return resultado
+    
     @classmethod
     def calcular_promedio_curso(cls, db: Session, curso_id: int) -> Optional[Decimal]:
         """
@@ -238,6 +300,11 @@ class GradeCalculator:
         
         return resultado
     
+    @staticmethod
+    def _notas_validas(valores) -> List[Decimal]:
+        """Filtra las notas registradas (no nulas y mayores a cero) como Decimal"""
+        return [Decimal(str(valor)) for valor in valores if valor is not None and valor > 0]
+    
     @classmethod
     def _calcular_promedio_lista(cls, valores: List[Decimal]) -> Decimal:
         """Calcula el promedio de una lista de valores"""
@@ -1,8 +1,9 @@
 """
 Modelos compartidos del sistema
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey, Text, Numeric, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey, Text, Numeric, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from ..database import Base
 import enum
@@ -57,9 +58,14 @@ class User(Base):
     def __repr__(self):
         return f"<User(dni={self.dni}, email={self.email}, role={self.role})>"
     
-    @property
+    @hybrid_property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
+    
+    @full_name.expression
+    def full_name(cls):
+        # Permite seleccionar/filtrar el nombre completo directamente en SQL
+        return cls.first_name + " " + cls.last_name
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
@@ -133,6 +139,13 @@ class Curso(Base):
     docente = relationship("User",back_populates="cursos_docente",foreign_keys=[docente_id])
     notas = relationship("Nota", back_populates="curso")
     
+    __table_args__ = (
+        # Cursos activos de los ciclos matriculados (ciclo_id IN (...) AND is_active)
+        Index('ix_curso_ciclo_activo', 'ciclo_id', 'is_active'),
+        # Cursos activos del docente (docente_id = ? AND is_active), en todas las rutas del docente
+        Index('ix_curso_docente_activo', 'docente_id', 'is_active'),
+    )
+    
     def __repr__(self):
         return f"<Curso(id={self.id}, nombre='{self.nombre}')>"
 
@@ -153,6 +166,15 @@ class Matricula(Base):
     estudiante = relationship("User", back_populates="estudiante_matriculas", foreign_keys=[estudiante_id])
     ciclo = relationship("Ciclo", back_populates="matriculas")
     
+    __table_args__ = (
+        # Matrículas activas del estudiante (estudiante_id, is_active) y verificación
+        # de matrícula en un ciclo concreto (+ ciclo_id) con el mismo índice
+        Index('ix_matricula_est_activa_ciclo', 'estudiante_id', 'is_active', 'ciclo_id'),
+        # Matrículas de los ciclos de un docente o curso: ciclo_id = ? / IN (...) AND is_active
+        # (los filtros por estado = 'activa' usan el mismo índice por ciclo_id)
+        Index('ix_matricula_ciclo_activa', 'ciclo_id', 'is_active'),
+    )
+    
     def __repr__(self):
         return f"<Matricula(estudiante_id={self.estudiante_id}, ciclo_id={self.ciclo_id})>"
 
@@ -163,25 +185,25 @@ class Nota(Base):
     estudiante_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     curso_id = Column(Integer, ForeignKey("cursos.id"), nullable=False)
     
-    # Evaluaciones (hasta 8)
-    evaluacion1 = Column(Numeric(4, 2), nullable=True)
-    evaluacion2 = Column(Numeric(4, 2), nullable=True)
-    evaluacion3 = Column(Numeric(4, 2), nullable=True)
-    evaluacion4 = Column(Numeric(4, 2), nullable=True)
-    evaluacion5 = Column(Numeric(4, 2), nullable=True)
-    evaluacion6 = Column(Numeric(4, 2), nullable=True)
-    evaluacion7 = Column(Numeric(4, 2), nullable=True)
-    evaluacion8 = Column(Numeric(4, 2), nullable=True)
+    # Evaluaciones (hasta 8) - se leen como float (asdecimal=False) para evitar la conversión Decimal -> float
+    evaluacion1 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion2 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion3 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion4 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion5 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion6 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion7 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    evaluacion8 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
 
     # Prácticas (hasta 4)
-    practica1 = Column(Numeric(4, 2), nullable=True)
-    practica2 = Column(Numeric(4, 2), nullable=True)
-    practica3 = Column(Numeric(4, 2), nullable=True)
-    practica4 = Column(Numeric(4, 2), nullable=True)
+    practica1 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    practica2 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    practica3 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    practica4 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
 
     # Parciales (hasta 2)
-    parcial1 = Column(Numeric(4, 2), nullable=True)
-    parcial2 = Column(Numeric(4, 2), nullable=True)
+    parcial1 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
+    parcial2 = Column(Numeric(4, 2, asdecimal=False), nullable=True)
 
     # Campos de control
     fecha_registro = Column(Date, nullable=False, default=func.current_date())
@@ -197,17 +219,20 @@ class Nota(Base):
     # Constraint para evitar duplicados
     __table_args__ = (
         UniqueConstraint('estudiante_id', 'curso_id', name='uq_estudiante_curso'),
+        # Notas recientes del estudiante (ORDER BY updated_at DESC LIMIT n)
+        Index('ix_nota_est_updated', 'estudiante_id', 'updated_at'),
+        # Notas de los cursos de un docente (curso_id IN (...)); uq_estudiante_curso empieza por estudiante_id
+        Index('ix_nota_curso_est', 'curso_id', 'estudiante_id'),
     )
     
     def calcular_promedio_final(self):
         """Calcula el promedio final usando GradeCalculator con pesos correctos: 10% evaluaciones, 30% prácticas, 60% parciales"""
-        from .grade_calculator import GradeCalculator
         promedio = GradeCalculator.calcular_promedio_nota(self)
         return float(promedio) if promedio is not None else 0.0
     
-    def obtener_estado(self):
-        """Determina el estado basado en el promedio final"""
-        promedio = self.calcular_promedio_final()
+    def obtener_estado(self, promedio_final=None):
+        """Determina el estado basado en el promedio final (se puede pasar ya calculado para no repetirlo)"""
+        promedio = self.calcular_promedio_final() if promedio_final is None else promedio_final
         return "APROBADO" if promedio >= 13 else "DESAPROBADO" if promedio > 0 else "PENDIENTE"
     
     def __repr__(self):
@@ -227,6 +252,9 @@ class DescripcionEvaluacion(Base):
     # Relaciones
     curso = relationship("Curso")
     
+    # Traer created_at/updated_at con RETURNING al hacer flush
+    __mapper_args__ = {"eager_defaults": True}
+    
     def __repr__(self):
         return f"<DescripcionEvaluacion(curso_id={self.curso_id}, tipo_evaluacion={self.tipo_evaluacion})>"
 
@@ -261,4 +289,8 @@ class SiteConfig(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     def __repr__(self):
-        return f"<SiteConfig(key={self.key}, value={self.value})>"
\ No newline at end of file
+        return f"<SiteConfig(key={self.key}, value={self.value})>"
+
+# Al final del módulo: grade_calculator importa Nota de este módulo (importación circular),
+# así Nota ya está definida y el import no se repite en cada llamada a calcular_promedio_final
+from .grade_calculator import GradeCalculator  # noqa: E402
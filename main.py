@@ -2,9 +2,12 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, Response
+from contextlib import asynccontextmanager
+from anyio import to_thread
 import os
 from app.config import settings
 from app.database import engine, Base
+from app.shared.cache import init_cache
 
 # Importar todos los routers de los módulos
 from app.modules.auth.routes import router as auth_router
@@ -16,13 +19,22 @@ from app.modules.admin.config_routes import router as admin_config_router
 # Crear las tablas en la base de datos
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Los endpoints son síncronos y usan sesiones bloqueantes, FastAPI los ejecuta
+    # en el threadpool de anyio: su tamaño limita las peticiones concurrentes
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_workers
+    init_cache()
+    yield
+
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="Sistema de Notas Académico",
     description="API modular para gestión de notas académicas con roles diferenciados",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configurar CORS
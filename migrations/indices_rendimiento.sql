@@ -0,0 +1,23 @@
+-- Índices de rendimiento para bases de datos existentes (PostgreSQL).
+--
+-- Base.metadata.create_all() solo crea los índices al crear las tablas: en una base
+-- que ya existe hay que aplicarlos con este script. Es idempotente y usa CONCURRENTLY
+-- para no bloquear las escrituras, por eso no debe ejecutarse dentro de una transacción:
+--
+--   psql "$DATABASE_URL" -f migrations/indices_rendimiento.sql
+
+-- Reemplazados por otros índices (columnas reordenadas o duplicados por ciclo_id)
+DROP INDEX CONCURRENTLY IF EXISTS ix_matricula_est_ciclo_activa;
+DROP INDEX CONCURRENTLY IF EXISTS ix_matricula_ciclo_estado;
+
+-- notas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_nota_est_updated ON notas (estudiante_id, updated_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_nota_curso_est ON notas (curso_id, estudiante_id);
+
+-- matriculas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_matricula_est_activa_ciclo ON matriculas (estudiante_id, is_active, ciclo_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_matricula_ciclo_activa ON matriculas (ciclo_id, is_active);
+
+-- cursos
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_curso_ciclo_activo ON cursos (ciclo_id, is_active);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_curso_docente_activo ON cursos (docente_id, is_active);